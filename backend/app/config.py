@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict
 
 class Settings(BaseSettings):
     # Database
@@ -9,9 +10,24 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REVOCATION_RESYNC_SECONDS: int = 30  # each worker re-reads revoked tokens this often
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # 0 disables the authenticated-user cache
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300  # 0 disables the analytics response cache; complaint changes also clear it
+    ANALYTICS_CACHE_LOCK_SECONDS: int = 10  # longest one worker recomputes an entry while others wait
+    
+    # Password hashing: bcrypt cost factor and its dedicated thread pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    
+    # Bulk user provisioning: CLI hashing processes (0 = one per CPU) and insert batch size
+    PROVISIONING_HASH_PROCESSES: int = 0
+    PROVISIONING_BATCH_SIZE: int = 500
     
     # Redis
     REDIS_URL: str
+    CACHE_BACKEND: str = "redis"  # "redis" (shared, falls back to in-process) or "memory"
     
     # Email
     SMTP_HOST: str
@@ -25,6 +41,52 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 5242880  # 5MB
     FRONTEND_URL: str = "http://localhost:8501"
+    QUERY_COUNT_HEADER: bool = False  # add X-DB-Query-Count to responses
+    
+    # File downloads: set SENDFILE_HEADER to "X-Accel-Redirect" (nginx) or
+    # "X-Sendfile" (Apache) to let the proxy serve files from SENDFILE_PREFIX
+    SENDFILE_HEADER: str = ""
+    SENDFILE_PREFIX: str = "/protected-uploads"
+    
+    # Image processing
+    IMAGE_WORKERS: int = 2
+    
+    # Complaint IDs reserved per database round trip
+    COMPLAINT_ID_BLOCK_SIZE: int = 20
+    
+    # Auto-assignment: how often each worker rebuilds its officer load index
+    ASSIGNMENT_RESYNC_SECONDS: int = 60
+    
+    # Real-time events: "memory" (single process) or "redis" (fan-out across workers)
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_KEEPALIVE_SECONDS: int = 20
+    
+    # Idempotency-Key retention for complaint submission
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_PENDING_SECONDS: int = 120
+    
+    # Audit anchoring: entries per Merkle tree, and how old an entry must be
+    # before it is anchored (so slower transactions can commit lower ids first)
+    AUDIT_ANCHOR_BATCH_SIZE: int = 1024
+    AUDIT_ANCHOR_SETTLE_SECONDS: int = 60
+    
+    # Hash scheme for new audit entries (1: sorted JSON, 2: length-prefixed fields).
+    # Entries keep the version they were written with, so both always verify.
+    AUDIT_HASH_VERSION: int = 2
+    
+    # Audit archive: whole months older than this many days are moved out of
+    # audit_logs into compressed segment files (only once they are anchored)
+    AUDIT_ARCHIVE_DIR: str = "audit_archive"
+    AUDIT_ARCHIVE_AFTER_DAYS: int = 90
+    
+    # Rate limits, merged over the defaults in rate_limit_service, as JSON:
+    # {"complaints:create": {"citizen": "5/minute", "ip": "30/minute"}}
+    RATE_LIMITS: Dict[str, Dict[str, str]] = {}
+    
+    # Admission control for requests that run model inference (per worker)
+    INFERENCE_MAX_CONCURRENT: int = 4
+    INFERENCE_MAX_QUEUE: int = 16
+    INFERENCE_QUEUE_TIMEOUT_SECONDS: float = 10.0
     
     class Config:
         env_file = ".env"
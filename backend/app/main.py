@@ -1,7 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from .config import get_settings
 from .database import engine, Base
-from .routers import auth, complaints, analytics
+from .routers import auth, complaints, analytics, events, system, audit
+from .services.image_service import image_service
+from .services.event_bus import event_bus
+from .services.password_service import password_hasher
+from .services.token_revocation_service import token_revocation_service
+from .services import rollup_service  # registers the session hooks that keep analytics rollups current
+from .utils.query_counter import count_queries
 
 # ⭐ ADD THESE TWO LINES - CRITICAL! ⭐
 from .models import user, complaint
@@ -32,10 +39,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+settings = get_settings()
+
+if settings.QUERY_COUNT_HEADER:
+    @app.middleware("http")
+    async def add_query_count_header(request: Request, call_next):
+        with count_queries() as counter:
+            response = await call_next(request)
+        response.headers["X-DB-Query-Count"] = str(counter.value)
+        return response
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(complaints.router)
 app.include_router(analytics.router)
+app.include_router(events.router)
+app.include_router(system.router)
+app.include_router(audit.router)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    await event_bus.start()
+    await token_revocation_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await event_bus.stop()
+    await token_revocation_service.stop()
+    image_service.shutdown()
+    password_hasher.shutdown()
 
 @app.get("/")
 def root():
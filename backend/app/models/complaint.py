@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Enum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Boolean, Float, Enum, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -14,6 +15,15 @@ class ComplaintStatus(enum.Enum):
     ESCALATED = "escalated"
     REJECTED = "rejected"
 
+# Statuses that still need work from the assigned officer
+OPEN_STATUSES = [
+    ComplaintStatus.SUBMITTED,
+    ComplaintStatus.UNDER_REVIEW,
+    ComplaintStatus.IN_PROGRESS,
+    ComplaintStatus.PENDING_CITIZEN_INPUT,
+    ComplaintStatus.ESCALATED
+]
+
 class ComplaintPriority(enum.Enum):
     CRITICAL = "critical"
     HIGH = "high"
@@ -32,6 +42,11 @@ class ComplaintCategory(enum.Enum):
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    __table_args__ = (
+        Index("ix_complaints_queue", "status", "assigned_to", "ward"),
+    )
+    # Fetch created_at on insert; the analytics rollups need it at flush time
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(String, unique=True, index=True, nullable=False)
@@ -57,6 +72,32 @@ class Complaint(Base):
     comments = relationship("Comment", back_populates="complaint", cascade="all, delete-orphan")
     audit_logs = relationship("AuditLog", back_populates="complaint", cascade="all, delete-orphan")
 
+class ComplaintRollup(Base):
+    """
+    Daily totals of complaints by creation day (UTC), ward, category, status
+    and priority. Every complaint counts in exactly one row; the rows are
+    adjusted in the same transaction as the complaint changes.
+    """
+    __tablename__ = "complaint_rollups"
+    
+    day = Column(Date, primary_key=True)
+    ward = Column(String, primary_key=True)
+    category = Column(Enum(ComplaintCategory), primary_key=True)
+    status = Column(Enum(ComplaintStatus), primary_key=True)
+    priority = Column(Enum(ComplaintPriority), primary_key=True)
+    complaints = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)  # complaints with resolved_at
+    resolution_seconds = Column(Float, nullable=False, default=0.0)  # sum of resolved_at - created_at
+    sentiment_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_count = Column(Integer, nullable=False, default=0)
+
+class ComplaintIdSequence(Base):
+    """Next complaint sequence number per month, reserved in blocks by the ID allocator"""
+    __tablename__ = "complaint_id_sequences"
+    
+    period = Column(String(7), primary_key=True)  # YYYY-MM
+    next_value = Column(Integer, nullable=False)
+
 class Attachment(Base):
     __tablename__ = "attachments"
     
@@ -64,12 +105,40 @@ class Attachment(Base):
     complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
     file_path = Column(String, nullable=False)
     file_type = Column(String, nullable=False)
+    original_filename = Column(String)
+    file_size = Column(Integer)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the stored file
+    uploaded_by = Column(Integer, ForeignKey("users.id"))
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Filled in by the image pipeline
+    width = Column(Integer)
+    height = Column(Integer)
+    phash = Column(String(16))  # 64-bit perceptual hash, hex
+    processed_at = Column(DateTime(timezone=True))
+    
     complaint = relationship("Complaint", back_populates="attachments")
 
+class ImageHashBand(Base):
+    """Perceptual hash split into bands for near-duplicate lookup within a ward"""
+    __tablename__ = "image_hash_bands"
+    __table_args__ = (
+        Index("ix_image_hash_bands_lookup", "ward", "band", "value"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    attachment_id = Column(Integer, ForeignKey("attachments.id", ondelete="CASCADE"), nullable=False, index=True)
+    complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
+    ward = Column(String, nullable=False)
+    band = Column(Integer, nullable=False)
+    value = Column(Integer, nullable=False)
+
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_complaint_id_id", "complaint_id", "id"),
+        Index("ix_comments_complaint_created", "complaint_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
@@ -83,6 +152,17 @@ class Comment(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_complaint_id_id", "complaint_id", "id"),
+        Index("ix_audit_logs_timestamp", "timestamp"),
+        Index("ix_audit_logs_user_id_id", "user_id", "id"),
+        Index("ix_audit_logs_action_type_id", "action_type", "id"),
+        # Containment (@>) lookups on details fields
+        Index(
+            "ix_audit_logs_details", "details",
+            postgresql_using="gin", postgresql_ops={"details": "jsonb_path_ops"}
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id"), nullable=False)
@@ -90,15 +170,61 @@ class AuditLog(Base):
     action_type = Column(String, nullable=False)
     previous_state = Column(String)
     new_state = Column(String)
-    details = Column(Text)  # JSON string
+    details = Column(JSON().with_variant(JSONB(), "postgresql"))
+    # details exactly as hashed; JSONB does not preserve number spelling (1e16, -0.0)
+    details_text = Column(Text)
     ip_address = Column(String)
     hash = Column(String, nullable=False)
     previous_hash = Column(String)
+    hash_version = Column(Integer, nullable=False, default=1, server_default="1")
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     complaint = relationship("Complaint", back_populates="audit_logs")
     user = relationship("User")
 
+class AuditChainHead(Base):
+    """Latest hash of a complaint's audit chain; its row lock serializes appends to the chain"""
+    __tablename__ = "audit_chain_heads"
+    
+    complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), primary_key=True)
+    last_hash = Column(String, nullable=False, default="")
+    length = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class AuditAnchor(Base):
+    """Merkle root over the audit log entries with ids first_log_id..last_log_id"""
+    __tablename__ = "audit_anchors"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    first_log_id = Column(Integer, nullable=False)
+    last_log_id = Column(Integer, nullable=False, unique=True)
+    size = Column(Integer, nullable=False)
+    root = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class AuditArchiveSegment(Base):
+    """Compressed file holding the archived audit entries with ids first_log_id..last_log_id"""
+    __tablename__ = "audit_archive_segments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False, index=True)  # YYYY-MM of the entries' timestamps
+    path = Column(String, nullable=False)  # relative to AUDIT_ARCHIVE_DIR
+    first_log_id = Column(Integer, nullable=False)
+    last_log_id = Column(Integer, nullable=False, unique=True)
+    entries = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    index_sha256 = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class AuditCheckpoint(Base):
+    """Last audit log entry verified for a complaint, so verification can resume from it"""
+    __tablename__ = "audit_checkpoints"
+    
+    complaint_id = Column(Integer, ForeignKey("complaints.id", ondelete="CASCADE"), primary_key=True)
+    last_log_id = Column(Integer, nullable=False)
+    last_hash = Column(String, nullable=False)
+    verified_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class Feedback(Base):
     __tablename__ = "feedback"
     
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, ForeignKey
 from sqlalchemy.sql import func
 from ..database import Base
+from .complaint import ComplaintCategory
 import enum
+from datetime import datetime
 
 class UserRole(enum.Enum):
     CITIZEN = "citizen"
@@ -19,8 +21,24 @@ class User(Base):
     full_name = Column(String, nullable=False)
     phone = Column(String)
     ward = Column(String)
+    department = Column(Enum(ComplaintCategory))  # officer specialisation; None = any category
     address = Column(String)
     is_verified = Column(Boolean, default=False)
     verification_token = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class RevokedToken(Base):
+    """
+    Revoked token families (logout, refresh-token reuse) and spent refresh
+    tokens. Rows can be purged once expires_at has passed.
+    """
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    token_id = Column(String(64), unique=True, nullable=False)  # family id or refresh token jti
+    kind = Column(String(16), nullable=False)  # "family" or "refresh"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    reason = Column(String(50))
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,63 +1,77 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func, case, and_
 from ..database import get_db
-from ..models.complaint import Complaint, ComplaintStatus, ComplaintCategory, Feedback
+from ..models.complaint import Complaint, ComplaintStatus, ComplaintCategory, ComplaintRollup, Feedback
 from ..models.user import User, UserRole
+from ..services.analytics_cache import analytics_cache
+from ..services.heatmap_service import heatmap_service, MAX_WEEKS
 from ..utils.security import get_current_active_user
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
 @router.get("/overview")
 def get_overview_analytics(
+    ward: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get overview analytics"""
+    """Get overview analytics, optionally for one ward"""
     
-    # Total complaints
-    total_complaints = db.query(func.count(Complaint.id)).scalar()
+    return analytics_cache.get_or_compute(
+        ("overview", current_user.role.value, ward or "*"),
+        lambda: _overview(db, ward)
+    )
+
+def _overview(db: Session, ward: Optional[str]) -> dict:
+    today = datetime.utcnow().date()
+    current_month_start = today.replace(day=1)
+    previous_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+    
+    # One scan: totals by status plus the month counts as conditional sums
+    query = db.query(
+        ComplaintRollup.status,
+        func.sum(ComplaintRollup.complaints),
+        func.sum(ComplaintRollup.resolved),
+        func.sum(ComplaintRollup.resolution_seconds),
+        func.sum(case(
+            (ComplaintRollup.day >= current_month_start, ComplaintRollup.complaints),
+            else_=0
+        )),
+        func.sum(case(
+            (and_(
+                ComplaintRollup.day >= previous_month_start,
+                ComplaintRollup.day < current_month_start
+            ), ComplaintRollup.complaints),
+            else_=0
+        ))
+    )
+    if ward:
+        query = query.filter(ComplaintRollup.ward == ward)
+    status_rows = query.group_by(ComplaintRollup.status).all()
+    
+    status_distribution = {row[0].value: int(row[1]) for row in status_rows if row[1]}
+    total_complaints = sum(status_distribution.values())
     
     # Resolved complaints
-    resolved_complaints = db.query(func.count(Complaint.id)).filter(
-        Complaint.status.in_([ComplaintStatus.RESOLVED, ComplaintStatus.CLOSED])
-    ).scalar()
+    resolved_complaints = sum(
+        int(row[1]) for row in status_rows
+        if row[0] in (ComplaintStatus.RESOLVED, ComplaintStatus.CLOSED)
+    )
     
     # Resolution rate
     resolution_rate = (resolved_complaints / total_complaints * 100) if total_complaints > 0 else 0
     
     # Average resolution time
-    avg_resolution_time = db.query(
-        func.avg(
-            func.extract('epoch', Complaint.resolved_at - Complaint.created_at) / 86400
-        )
-    ).filter(
-        Complaint.resolved_at.isnot(None)
-    ).scalar()
-    
-    # Complaints by status
-    status_counts = db.query(
-        Complaint.status,
-        func.count(Complaint.id)
-    ).group_by(Complaint.status).all()
-    
-    status_distribution = {status.value: count for status, count in status_counts}
+    resolved_with_time = sum(int(row[2] or 0) for row in status_rows)
+    resolution_seconds = sum(float(row[3] or 0) for row in status_rows)
+    avg_resolution_time = resolution_seconds / resolved_with_time / 86400 if resolved_with_time else None
     
     # Current month vs previous month
-    now = datetime.utcnow()
-    current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    previous_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-    
-    current_month_complaints = db.query(func.count(Complaint.id)).filter(
-        Complaint.created_at >= current_month_start
-    ).scalar()
-    
-    previous_month_complaints = db.query(func.count(Complaint.id)).filter(
-        Complaint.created_at >= previous_month_start,
-        Complaint.created_at < current_month_start
-    ).scalar()
+    current_month_complaints = sum(int(row[4] or 0) for row in status_rows)
+    previous_month_complaints = sum(int(row[5] or 0) for row in status_rows)
     
     return {
         "total_complaints": total_complaints,
@@ -76,27 +90,22 @@ def get_category_analytics(
 ):
     """Get category-wise analytics"""
     
-    # Complaints by category
-    category_counts = db.query(
-        Complaint.category,
-        func.count(Complaint.id)
-    ).group_by(Complaint.category).all()
-    
-    # Resolution time by category
-    resolution_times = db.query(
-        Complaint.category,
-        func.avg(
-            func.extract('epoch', Complaint.resolved_at - Complaint.created_at) / 86400
-        )
-    ).filter(
-        Complaint.resolved_at.isnot(None)
-    ).group_by(Complaint.category).all()
+    return analytics_cache.get_or_compute(("category",), lambda: _category(db))
+
+def _category(db: Session) -> dict:
+    # Complaints and resolution time by category
+    category_rows = db.query(
+        ComplaintRollup.category,
+        func.sum(ComplaintRollup.complaints),
+        func.sum(ComplaintRollup.resolved),
+        func.sum(ComplaintRollup.resolution_seconds)
+    ).group_by(ComplaintRollup.category).all()
     
     return {
-        "category_counts": {cat.value: count for cat, count in category_counts},
+        "category_counts": {cat.value: int(count) for cat, count, _, _ in category_rows if count},
         "avg_resolution_by_category": {
-            cat.value: round(avg_time, 2) if avg_time else 0
-            for cat, avg_time in resolution_times
+            cat.value: round(float(seconds) / resolved / 86400, 2)
+            for cat, _, resolved, seconds in category_rows if resolved
         }
     }
 
@@ -108,32 +117,29 @@ def get_trend_analytics(
 ):
     """Get time-series trends"""
     
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Daily complaint counts
-    daily_counts = db.query(
-        func.date(Complaint.created_at).label('date'),
-        func.count(Complaint.id).label('count')
-    ).filter(
-        Complaint.created_at >= start_date
-    ).group_by(func.date(Complaint.created_at)).all()
-    
-    # Sentiment trends
-    sentiment_avg = db.query(
-        func.date(Complaint.created_at).label('date'),
-        func.avg(Complaint.sentiment_score).label('avg_sentiment')
+    return analytics_cache.get_or_compute(("trends", days), lambda: _trends(db, days))
+
+def _trends(db: Session, days: int) -> dict:
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
+    
+    # Daily complaint counts and sentiment
+    daily = db.query(
+        ComplaintRollup.day,
+        func.sum(ComplaintRollup.complaints),
+        func.sum(ComplaintRollup.sentiment_sum),
+        func.sum(ComplaintRollup.sentiment_count)
     ).filter(
-        Complaint.created_at >= start_date
-    ).group_by(func.date(Complaint.created_at)).all()
+        ComplaintRollup.day >= start_date
+    ).group_by(ComplaintRollup.day).order_by(ComplaintRollup.day).all()
     
     return {
         "daily_complaints": [
-            {"date": str(date), "count": count}
-            for date, count in daily_counts
+            {"date": str(day), "count": int(count)}
+            for day, count, _, _ in daily if count
         ],
         "sentiment_trend": [
-            {"date": str(date), "avg_sentiment": round(float(avg), 2)}
-            for date, avg in sentiment_avg
+            {"date": str(day), "avg_sentiment": round(float(total) / scored, 2)}
+            for day, _, total, scored in daily if scored
         ]
     }
 
@@ -147,6 +153,9 @@ def get_performance_analytics(
     if current_user.role not in [UserRole.ADMIN, UserRole.OFFICER]:
         return {"message": "Access restricted"}
     
+    return analytics_cache.get_or_compute(("performance",), lambda: _performance(db))
+
+def _performance(db: Session) -> dict:
     # Officer performance
     officer_stats = db.query(
         User.id,
@@ -177,3 +186,16 @@ def get_performance_analytics(
             for officer_id, name, total, resolved, avg_time in officer_stats
         ]
     }
+
+@router.get("/heatmap")
+def get_heatmap_analytics(
+    weeks: int = Query(12, ge=1, le=MAX_WEEKS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Ward x category matrices of complaints, open backlog and median resolution days, plus weekly counts"""
+    
+    if current_user.role not in [UserRole.ADMIN, UserRole.OFFICER]:
+        return {"message": "Access restricted"}
+    
+    return analytics_cache.get_or_compute(("heatmap", weeks), lambda: heatmap_service.build(db, weeks))
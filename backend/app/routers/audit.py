@@ -0,0 +1,256 @@
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from ..database import get_db
+from ..models.user import User, UserRole
+from ..models.complaint import AuditLog, AuditAnchor, Complaint
+from ..schemas.audit import (
+    AuditAnchorResponse, InclusionProofResponse,
+    ProofVerificationRequest, ProofVerificationResponse,
+    AuditHistoryResponse, AuditEntryResponse
+)
+from ..utils.security import get_current_active_user
+from ..utils.merkle import audit_leaf, verify_inclusion
+from ..services.audit_anchor_service import audit_anchor_service, AnchorMismatchError
+from ..services.audit_archive import audit_archive, ArchiveCorruptError, ARCHIVE_COLUMNS
+
+router = APIRouter(prefix="/api/audit", tags=["Audit"])
+
+def _check_complaint_access(db: Session, current_user: User, complaint_id: int):
+    if current_user.role == UserRole.CITIZEN:
+        citizen_id = db.query(Complaint.citizen_id).filter(Complaint.id == complaint_id).scalar()
+        if citizen_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+def _history_entry(entry: dict, archived: bool) -> dict:
+    details = entry["details"]
+    if isinstance(details, str):
+        # Entries written before details became a JSON column
+        details = json.loads(details) if details else None
+    return {**entry, "details": details or {}, "archived": archived}
+
+def _parse_details_filter(details: Optional[str]) -> Optional[dict]:
+    if details is None:
+        return None
+    try:
+        wanted = json.loads(details)
+    except ValueError:
+        wanted = None
+    if not isinstance(wanted, dict) or not wanted:
+        raise HTTPException(status_code=400, detail="details must be a non-empty JSON object")
+    return wanted
+
+def _details_condition(db: Session, wanted: dict):
+    """SQL filter for entries whose details contain `wanted`"""
+    if db.bind.dialect.name == "postgresql":
+        # jsonb @> is served by the GIN index on details
+        return type_coerce(AuditLog.details, JSONB).contains(wanted)
+    
+    conditions = []
+    for key, value in wanted.items():
+        element = AuditLog.details[key]
+        if isinstance(value, bool):
+            conditions.append(element.as_boolean() == value)
+        elif isinstance(value, int):
+            conditions.append(element.as_integer() == value)
+        elif isinstance(value, float):
+            conditions.append(element.as_float() == value)
+        elif isinstance(value, str):
+            conditions.append(element.as_string() == value)
+        else:
+            raise HTTPException(status_code=400, detail="Nested details filters need PostgreSQL")
+    return and_(*conditions)
+
+def _contains(value: Any, wanted: Any) -> bool:
+    """Python equivalent of jsonb @>, for archived entries"""
+    if isinstance(wanted, dict):
+        return isinstance(value, dict) and all(
+            key in value and _contains(value[key], item) for key, item in wanted.items()
+        )
+    if isinstance(wanted, list):
+        return isinstance(value, list) and all(any(_contains(v, item) for v in value) for item in wanted)
+    return value == wanted
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+@router.get("/anchors", response_model=List[AuditAnchorResponse])
+def list_anchors(
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Published Merkle roots of the audit log, newest first"""
+    query = db.query(AuditAnchor)
+    if before_id:
+        query = query.filter(AuditAnchor.id < before_id)
+    
+    return query.order_by(AuditAnchor.id.desc()).limit(limit).all()
+
+@router.get("/anchors/{anchor_id}", response_model=AuditAnchorResponse)
+def get_anchor(anchor_id: int, db: Session = Depends(get_db)):
+    """Get one published Merkle root"""
+    anchor = db.query(AuditAnchor).filter(AuditAnchor.id == anchor_id).first()
+    if not anchor:
+        raise HTTPException(status_code=404, detail="Anchor not found")
+    
+    return anchor
+
+@router.get("/proof/{log_id}", response_model=InclusionProofResponse)
+def get_inclusion_proof(
+    log_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Prove an audit entry is part of a published anchor root"""
+    log = db.query(AuditLog.id, AuditLog.hash, AuditLog.complaint_id).filter(AuditLog.id == log_id).first()
+    if not log:
+        try:
+            archived = audit_archive.entry(db, log_id)
+        except ArchiveCorruptError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        log = (archived["id"], archived["hash"], archived["complaint_id"]) if archived else None
+    if not log:
+        raise HTTPException(status_code=404, detail="Audit entry not found")
+    
+    _check_complaint_access(db, current_user, log[2])
+    
+    anchor = audit_anchor_service.anchor_for(db, log_id)
+    if not anchor:
+        raise HTTPException(status_code=404, detail="Audit entry is not anchored yet")
+    
+    try:
+        return audit_anchor_service.inclusion_proof(db, log[0], log[1], anchor)
+    except AnchorMismatchError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ArchiveCorruptError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/logs", response_model=List[AuditEntryResponse])
+def list_audit_logs(
+    complaint_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    details: Optional[str] = Query(None, description='JSON object the details must contain, e.g. {"assigned_to": 17}'),
+    before_id: Optional[int] = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Search the audit log, newest first; page backwards with before_id.
+    Filtering by complaint also searches that complaint's archived entries.
+    """
+    wanted = _parse_details_filter(details)
+    limit = max(1, min(limit, 200))
+    
+    query = db.query(*(getattr(AuditLog, column) for column in ARCHIVE_COLUMNS))
+    
+    if complaint_id is not None:
+        if not db.query(Complaint.id).filter(Complaint.id == complaint_id).first():
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        _check_complaint_access(db, current_user, complaint_id)
+        query = query.filter(AuditLog.complaint_id == complaint_id)
+    elif current_user.role == UserRole.CITIZEN:
+        query = query.join(Complaint, Complaint.id == AuditLog.complaint_id).filter(
+            Complaint.citizen_id == current_user.id
+        )
+    
+    if user_id is not None:
+        query = query.filter(AuditLog.user_id == user_id)
+    if action_type:
+        query = query.filter(AuditLog.action_type == action_type)
+    if since is not None:
+        query = query.filter(AuditLog.timestamp >= since)
+    if until is not None:
+        query = query.filter(AuditLog.timestamp < until)
+    if wanted:
+        query = query.filter(_details_condition(db, wanted))
+    if before_id is not None:
+        query = query.filter(AuditLog.id < before_id)
+    
+    entries = [_history_entry(dict(row._mapping), False) for row in query.order_by(AuditLog.id.desc()).limit(limit)]
+    if complaint_id is None or len(entries) == limit:
+        return entries
+    
+    # Archived entries all precede the live ones, so they continue the page
+    try:
+        archived = audit_archive.complaint_entries(db, complaint_id)
+    except ArchiveCorruptError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    for entry in reversed(archived):
+        entry = _history_entry(entry, True)
+        timestamp = _as_utc(datetime.fromisoformat(entry["timestamp"])) if entry["timestamp"] else None
+        if (
+            (before_id is not None and entry["id"] >= before_id)
+            or (user_id is not None and entry["user_id"] != user_id)
+            or (action_type and entry["action_type"] != action_type)
+            or (since is not None and (timestamp is None or timestamp < _as_utc(since)))
+            or (until is not None and (timestamp is None or timestamp >= _as_utc(until)))
+            or (wanted and not _contains(entry["details"], wanted))
+        ):
+            continue
+        entries.append(entry)
+        if len(entries) == limit:
+            break
+    
+    return entries
+
+@router.get("/complaints/{complaint_id}/history", response_model=AuditHistoryResponse)
+def get_audit_history(
+    complaint_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Full audit trail of a complaint, archived entries first"""
+    if not db.query(Complaint.id).filter(Complaint.id == complaint_id).first():
+        raise HTTPException(status_code=404, detail="Complaint not found")
+    
+    _check_complaint_access(db, current_user, complaint_id)
+    
+    try:
+        archived = audit_archive.complaint_entries(db, complaint_id)
+    except ArchiveCorruptError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    live = db.query(*(getattr(AuditLog, column) for column in ARCHIVE_COLUMNS)).filter(
+        AuditLog.complaint_id == complaint_id
+    ).order_by(AuditLog.id).all()
+    
+    entries = [_history_entry(entry, True) for entry in archived]
+    entries += [_history_entry(dict(row._mapping), False) for row in live]
+    
+    return {"complaint_id": complaint_id, "entries": entries}
+
+@router.post("/verify-proof", response_model=ProofVerificationResponse)
+def verify_proof(request: ProofVerificationRequest, db: Session = Depends(get_db)):
+    """
+    Check an inclusion proof without trusting the server's copy of the
+    entry. Also reports which published anchor, if any, has this root.
+    """
+    try:
+        proof = [bytes.fromhex(node) for node in request.proof]
+        root = bytes.fromhex(request.root)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Proof and root must be hex encoded")
+    
+    valid = verify_inclusion(
+        audit_leaf(request.log_id, request.log_hash),
+        request.leaf_index,
+        request.tree_size,
+        proof,
+        root
+    )
+    anchor = db.query(AuditAnchor.id).filter(
+        AuditAnchor.root == request.root.lower(),
+        AuditAnchor.size == request.tree_size
+    ).first()
+    
+    return {"valid": valid, "anchor_id": anchor[0] if anchor else None}
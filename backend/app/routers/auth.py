@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from datetime import timedelta
+from datetime import datetime
 from ..database import get_db
-from ..models.user import User
-from ..schemas.user import UserCreate, UserLogin, UserResponse, Token
+from ..models.user import User, UserRole
+from ..schemas.user import (
+    UserCreate, UserLogin, UserResponse, Token, RefreshRequest, ProvisionResponse
+)
 from ..utils.security import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
-    get_current_active_user
+    create_token_pair,
+    decode_token,
+    get_current_active_user,
+    oauth2_scheme
 )
+from ..utils.rate_limit import ip_rate_limit
 from ..utils.helpers import generate_verification_token
 from ..services.notification_service import notification_service
+from ..services.password_service import password_hasher
+from ..services.rate_limit_service import ServiceOverloaded
+from ..services.token_revocation_service import token_revocation_service
+from ..services.provisioning_service import provisioning_service, ProvisioningError
 from ..config import get_settings
 import logging
 
@@ -20,12 +28,43 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 settings = get_settings()
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+def _find_user(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _save_user(db: Session, db_user: User):
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+
+async def _rehash_password(db: Session, user: User, password: str):
+    """Re-hash with the current cost factor; a failure here never fails the login"""
+    email = user.email
+    try:
+        user.password_hash = await password_hasher.hash(password)
+        await run_in_threadpool(db.commit)
+        logger.info(f"Password hash upgraded for {email}")
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        logger.warning(f"Password rehash failed for {email}: {e}")
+
+def _hashing_busy(e: ServiceOverloaded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry later",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(ip_rate_limit("auth:register"))]
+)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     try:
         # Check if user exists
-        existing_user = db.query(User).filter(User.email == user.email).first()
+        existing_user = await run_in_threadpool(_find_user, db, user.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,32 +78,35 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         verification_token = generate_verification_token()
         db_user = User(
             email=user.email,
-            password_hash=get_password_hash(password),
+            password_hash=await password_hasher.hash(password),
             full_name=user.full_name,
             phone=user.phone,
             ward=user.ward,
+            department=user.department,
             address=user.address,
             role=user.role,
             verification_token=verification_token,
             is_verified=True
         )
         
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await run_in_threadpool(_save_user, db, db_user)
         
         logger.info(f"User registered: {user.email}")
         return db_user
         
+    except HTTPException:
+        raise
+    except ServiceOverloaded as e:
+        raise _hashing_busy(e)
     except IntegrityError as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         logger.error(f"Database integrity error: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         logger.error(f"Registration error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -72,30 +114,72 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
 
 
-@router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post("/bulk-register", response_model=ProvisionResponse)
+async def bulk_register(
+    file: UploadFile = File(...),
+    default_role: UserRole = UserRole.OFFICER,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create accounts from a CSV upload (admin only).
+    Columns: email, full_name, password and optionally role, phone, ward,
+    department, address. Rows without a role get `default_role`.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    content = await file.read(settings.MAX_FILE_SIZE + 1)
+    if len(content) > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="CSV file too large")
+    
+    try:
+        rows = provisioning_service.parse_csv(content)
+    except ProvisioningError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    results, valid = await run_in_threadpool(provisioning_service.prepare, db, rows, default_role)
+    
+    # Hashed on the shared bcrypt pool; the request waits without holding an API thread
+    try:
+        hashes = await password_hasher.hash_many(provisioning_service.passwords(valid))
+    except ServiceOverloaded as e:
+        raise _hashing_busy(e)
+    
+    result = await run_in_threadpool(provisioning_service.create, db, results, valid, hashes)
+    logger.info(f"Bulk registration by {current_user.email}: {result['created']} created, {result['failed']} failed")
+    return result
+
+
+@router.post("/login", response_model=Token, dependencies=[Depends(ip_rate_limit("auth:login"))])
+async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Login user and return JWT token"""
     try:
-        user = db.query(User).filter(User.email == user_credentials.email).first()
+        user = await run_in_threadpool(_find_user, db, user_credentials.email)
         
-        if not user or not verify_password(user_credentials.password, user.password_hash):
+        if not user or not await password_hasher.verify(user_credentials.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
+        email = user.email
+        
+        # Upgrade hashes made with an older cost factor while the password is at hand
+        if password_hasher.needs_rehash(user.password_hash):
+            await _rehash_password(db, user, user_credentials.password)
+        
+        # Access token plus a refresh token for a new token family
+        tokens = create_token_pair(email)
         
-        logger.info(f"User logged in: {user.email}")
-        return {"access_token": access_token, "token_type": "bearer"}
+        logger.info(f"User logged in: {email}")
+        return tokens
         
     except HTTPException:
         raise
+    except ServiceOverloaded as e:
+        raise _hashing_busy(e)
     except Exception as e:
         logger.error(f"Login error: {e}")
         raise HTTPException(
@@ -103,6 +187,56 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Login failed"
         )
 
+@router.post("/refresh", response_model=Token, dependencies=[Depends(ip_rate_limit("auth:refresh"))])
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access and refresh token.
+    Each refresh token works once; presenting a spent one again revokes
+    the whole login session it belongs to.
+    """
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_token(body.refresh_token, "refresh")
+    if payload is None or not payload.get("fam") or not payload.get("jti"):
+        raise invalid_token
+    family = payload["fam"]
+    
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    if not user or not user.is_verified:
+        raise invalid_token
+    user_id = user.id
+    
+    if token_revocation_service.is_family_revoked_in_db(db, family):
+        raise invalid_token
+    
+    try:
+        token_revocation_service.spend_refresh_token(
+            db, payload["jti"], user_id, datetime.utcfromtimestamp(payload["exp"])
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.warning(f"Refresh token reused for {payload['sub']}; revoking the session")
+        token_revocation_service.revoke_family(db, family, user_id, "refresh token reuse")
+        raise invalid_token
+    
+    return create_token_pair(payload["sub"], family)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Revoke the current session's access and refresh tokens"""
+    payload = decode_token(token)
+    if payload and payload.get("fam"):
+        token_revocation_service.revoke_family(db, payload["fam"], current_user.id, "logout")
+        logger.info(f"User logged out: {current_user.email}")
+
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """Get current user information"""
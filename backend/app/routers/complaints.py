@@ -1,40 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status, UploadFile, File, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 from ..database import get_db
 from ..models.user import User, UserRole
 from ..models.complaint import (
     Complaint, ComplaintStatus, ComplaintCategory, ComplaintPriority,
-    Attachment, Comment, Feedback
+    Attachment, Comment, Feedback, Notification
 )
 
 from ..schemas.complaint import (
     ComplaintCreate, ComplaintResponse, ComplaintUpdate,
-    CommentCreate, CommentResponse, FeedbackCreate, FeedbackResponse
+    BulkComplaintUpdate, BulkUpdateResponse, WorkQueueItem,
+    CommentCreate, CommentResponse, FeedbackCreate, FeedbackResponse,
+    AttachmentResponse, SimilarAttachmentResponse
 )
 from ..utils.security import get_current_active_user
-from ..utils.helpers import generate_complaint_id
+from ..utils.rate_limit import rate_limit, check_rate_limit
+from ..utils.helpers import validate_file_type
+from ..utils.file_response import file_response
+from ..utils.body_limit import body_size_limit, MULTIPART_OVERHEAD
 from ..services.ml_service import ml_service
 from ..services.audit_service import audit_service
 from ..services.notification_service import notification_service
+from ..services.complaint_id_service import complaint_id_allocator
+from ..services.assignment_service import assignment_service
+from ..services.work_queue_service import work_queue_service, MAX_CLAIM
+from ..services.event_bus import event_bus, complaint_event, user_channel
+from ..services.rate_limit_service import inference_gate, ServiceOverloaded
+from ..services.idempotency_service import idempotency_service, request_fingerprint, MAX_KEY_LENGTH
+from ..services.attachment_service import (
+    attachment_service, ALLOWED_EXTENSIONS, FileTooLargeError, extension_type, served_type
+)
+from ..services.image_service import image_service, VARIANTS, MAX_DUPLICATE_DISTANCE
 import os
 import shutil
 
 router = APIRouter(prefix="/api/complaints", tags=["Complaints"])
 
-@router.post("/", response_model=ComplaintResponse, status_code=status.HTTP_201_CREATED)
-def create_complaint(
-    complaint: ComplaintCreate,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Create a new complaint"""
+MAX_BULK_UPDATE = 500
+ORIGINAL_VARIANT = "original"  # the upload as received, metadata included
+
+def _change_events(complaint: Complaint, previous_status: Optional[str], previous_assignee: Optional[int]):
+    """Push events for a complaint's status and assignment changes"""
+    events = []
+    if complaint.status and complaint.status.value != previous_status:
+        events.append(complaint_event(
+            complaint, "status_changed",
+            previous_status=previous_status,
+            status=complaint.status.value
+        ))
+    if complaint.assigned_to != previous_assignee:
+        channels, event = complaint_event(
+            complaint, "assigned",
+            assigned_to=complaint.assigned_to,
+            previous_assigned_to=previous_assignee,
+            status=complaint.status.value
+        )
+        # The officer who lost the complaint drops it from their live queue
+        if previous_assignee:
+            channels.append(user_channel(previous_assignee))
+        events.append((channels, event))
+    return events
+
+def _get_complaint_for_user(db: Session, complaint_id: int, current_user: User) -> Complaint:
+    """Load a complaint, enforcing the same access rules as get_complaint"""
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     
-    # Generate complaint ID
-    complaint_id = generate_complaint_id()
+    if not complaint:
+        raise HTTPException(status_code=404, detail="Complaint not found")
     
+    # Check permissions
+    if current_user.role == UserRole.CITIZEN and complaint.citizen_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return complaint
+
+def _analyze_complaint(complaint: ComplaintCreate):
+    """Run the sentiment, category and priority models for a new complaint"""
     # Analyze sentiment
     try:
         sentiment_label, sentiment_score = ml_service.analyze_sentiment(complaint.description)
@@ -60,6 +104,100 @@ def create_complaint(
         print(f"Priority determination error: {e}")
         priority = ComplaintPriority.MEDIUM
     
+    return sentiment_score, category, priority
+
+@router.post(
+    "/",
+    response_model=ComplaintResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_complaint(
+    complaint: ComplaintCreate,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create a new complaint.
+    Retries sent with the same Idempotency-Key get the original response
+    instead of creating another complaint. Only requests that create a
+    complaint are charged to the rate limit, so replays are never refused.
+    """
+    if not idempotency_key:
+        check_rate_limit("complaints:create", request, current_user)
+        db_complaint = _store_complaint(complaint, db, current_user)
+        _announce_complaint(db_complaint, complaint, request, background_tasks, db, current_user)
+        return db_complaint
+    
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+    
+    fingerprint = request_fingerprint(complaint.model_dump_json())
+    previous = idempotency_service.begin(current_user.id, idempotency_key, fingerprint)
+    if previous:
+        if previous["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request"
+            )
+        if previous["state"] == "pending":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"}
+            )
+        return JSONResponse(
+            status_code=previous["status_code"],
+            content=previous["body"],
+            headers={"Idempotent-Replayed": "true"}
+        )
+    
+    # Only work that can fail before the complaint is committed may release the key
+    try:
+        check_rate_limit("complaints:create", request, current_user)
+        db_complaint = _store_complaint(complaint, db, current_user)
+    except Exception:
+        idempotency_service.release(current_user.id, idempotency_key)
+        raise
+    
+    # The complaint exists now: record it before the side effects, so a retry
+    # after any of them fails replays this complaint instead of filing another
+    idempotency_service.complete(
+        current_user.id,
+        idempotency_key,
+        fingerprint,
+        status.HTTP_201_CREATED,
+        ComplaintResponse.model_validate(db_complaint).model_dump(mode="json")
+    )
+    _announce_complaint(db_complaint, complaint, request, background_tasks, db, current_user)
+    return db_complaint
+
+def _store_complaint(complaint: ComplaintCreate, db: Session, current_user: User) -> Complaint:
+    """Classify, assign and commit a new complaint"""
+    
+    # Model inference is CPU-bound; shed load rather than queue without bound
+    try:
+        with inference_gate.admit():
+            sentiment_score, category, priority = _analyze_complaint(complaint)
+    except ServiceOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    # Generate complaint ID
+    complaint_id = complaint_id_allocator.next_id()
+    
+    # Route to the least loaded officer for the ward and category
+    try:
+        assigned_to = assignment_service.pick_officer(db, complaint.ward, category)
+    except Exception as e:
+        print(f"Auto-assignment error: {e}")
+        assigned_to = None
+    
     # Create complaint
     db_complaint = Complaint(
         complaint_id=complaint_id,
@@ -72,12 +210,25 @@ def create_complaint(
         is_anonymous=complaint.is_anonymous,
         sentiment_score=sentiment_score,
         priority=priority,
-        status=ComplaintStatus.SUBMITTED
+        status=ComplaintStatus.SUBMITTED,
+        assigned_to=assigned_to
     )
     
     db.add(db_complaint)
     db.commit()
     db.refresh(db_complaint)
+    return db_complaint
+
+def _announce_complaint(
+    db_complaint: Complaint,
+    complaint: ComplaintCreate,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session,
+    current_user: User
+):
+    """Audit, confirm and publish a committed complaint"""
+    complaint_id = db_complaint.complaint_id
     
     # Create audit log
     try:
@@ -88,7 +239,11 @@ def create_complaint(
             action_type="CREATED",
             previous_state=None,
             new_state=ComplaintStatus.SUBMITTED.value,
-            details={"title": complaint.title, "category": category.value},
+            details={
+                "title": complaint.title,
+                "category": db_complaint.category.value,
+                "assigned_to": db_complaint.assigned_to
+            },
             ip_address=request.client.host
         )
     except Exception as e:
@@ -105,6 +260,20 @@ def create_complaint(
         except Exception as e:
             print(f"Email notification error: {e}")
     
+    if db_complaint.officer:
+        background_tasks.add_task(
+            notification_service.send_assignment_notification,
+            db_complaint.officer.email,
+            complaint_id,
+            complaint.title
+        )
+    
+    event_bus.publish(*complaint_event(
+        db_complaint, "created",
+        status=db_complaint.status.value,
+        assigned_to=db_complaint.assigned_to
+    ))
+    
     return db_complaint
 
 
@@ -135,6 +304,49 @@ def list_complaints(
     complaints = query.order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
     return complaints
 
+@router.get("/queue", response_model=List[WorkQueueItem])
+def get_work_queue(
+    limit: int = 50,
+    include_unassigned: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Open complaints assigned to the officer (and unassigned ones), most urgent first"""
+    if current_user.role not in [UserRole.OFFICER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    queue = work_queue_service.get_queue(db, current_user, min(limit, 200), include_unassigned)
+    return [
+        WorkQueueItem(
+            **ComplaintResponse.model_validate(complaint).model_dump(),
+            urgency_score=round(float(score), 2)
+        )
+        for complaint, score in queue
+    ]
+
+@router.post("/queue/claim", response_model=List[ComplaintResponse])
+def claim_complaints(
+    request: Request,
+    count: int = 1,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Claim the next most urgent unassigned complaints (officer/admin only)"""
+    if current_user.role not in [UserRole.OFFICER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not 1 <= count <= MAX_CLAIM:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {MAX_CLAIM}")
+    
+    claimed = work_queue_service.claim_next(db, current_user, count, request.client.host)
+    # Claiming also moves submitted complaints to under review
+    event_bus.publish_many([
+        event
+        for complaint, previous_status, previous_assignee in claimed
+        for event in _change_events(complaint, previous_status, previous_assignee)
+    ])
+    return [complaint for complaint, _, _ in claimed]
+
 @router.get("/{complaint_id}", response_model=ComplaintResponse)
 def get_complaint(
     complaint_id: int,
@@ -142,22 +354,14 @@ def get_complaint(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get complaint details"""
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
-    
-    if not complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
-    
-    # Check permissions
-    if current_user.role == UserRole.CITIZEN and complaint.citizen_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    return complaint
+    return _get_complaint_for_user(db, complaint_id, current_user)
 
 @router.put("/{complaint_id}", response_model=ComplaintResponse)
 def update_complaint(
     complaint_id: int,
     complaint_update: ComplaintUpdate,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -171,6 +375,7 @@ def update_complaint(
     
     # Update fields
     previous_status = complaint.status.value if complaint.status else None
+    previous_assignee = complaint.assigned_to
     
     if complaint_update.status:
         complaint.status = complaint_update.status
@@ -183,6 +388,20 @@ def update_complaint(
     if complaint_update.category:
         complaint.category = complaint_update.category
     
+    # Escalations move to another officer unless an assignee was given
+    escalated_to = None
+    if complaint_update.status == ComplaintStatus.ESCALATED and not complaint_update.assigned_to:
+        try:
+            escalated_to = assignment_service.pick_officer(
+                db, complaint.ward, complaint.category,
+                exclude=[complaint.assigned_to] if complaint.assigned_to else []
+            )
+        except Exception as e:
+            print(f"Escalation assignment error: {e}")
+            escalated_to = None
+        if escalated_to:
+            complaint.assigned_to = escalated_to
+    
     db.commit()
     db.refresh(complaint)
     
@@ -207,8 +426,130 @@ def update_complaint(
             complaint.status.value
         )
     
+    if escalated_to and complaint.officer:
+        background_tasks.add_task(
+            notification_service.send_assignment_notification,
+            complaint.officer.email,
+            complaint.complaint_id,
+            complaint.title
+        )
+    
+    event_bus.publish_many(_change_events(complaint, previous_status, previous_assignee))
+    
     return complaint
 
+@router.post("/bulk-update", response_model=BulkUpdateResponse)
+def bulk_update_complaints(
+    bulk_update: BulkComplaintUpdate,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Apply one status/assignee/category change to many complaints in a single transaction (officer/admin only)"""
+    if current_user.role not in [UserRole.OFFICER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    complaint_ids = list(dict.fromkeys(bulk_update.complaint_ids))
+    if not complaint_ids:
+        raise HTTPException(status_code=400, detail="No complaints given")
+    if len(complaint_ids) > MAX_BULK_UPDATE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_UPDATE} complaints per request")
+    if not (bulk_update.status or bulk_update.assigned_to or bulk_update.category):
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    if bulk_update.assigned_to:
+        assignee = db.query(User).filter(User.id == bulk_update.assigned_to).first()
+        if not assignee or assignee.role not in [UserRole.OFFICER, UserRole.ADMIN]:
+            raise HTTPException(status_code=400, detail="Assignee must be an officer or admin")
+    
+    complaints = {
+        complaint.id: complaint
+        for complaint in db.query(Complaint).options(
+            joinedload(Complaint.citizen)
+        ).filter(Complaint.id.in_(complaint_ids)).all()
+    }
+    
+    results = []
+    audit_entries = []
+    notifications = []
+    emails = []
+    events = []
+    escalation_picks = {}
+    
+    for complaint_id in complaint_ids:
+        complaint = complaints.get(complaint_id)
+        if not complaint:
+            results.append({"complaint_id": complaint_id, "success": False, "detail": "Complaint not found"})
+            continue
+        
+        previous_status = complaint.status.value if complaint.status else None
+        previous_assignee = complaint.assigned_to
+        
+        if bulk_update.status:
+            complaint.status = bulk_update.status
+            if bulk_update.status == ComplaintStatus.RESOLVED:
+                complaint.resolved_at = datetime.utcnow()
+        
+        if bulk_update.assigned_to:
+            complaint.assigned_to = bulk_update.assigned_to
+        
+        if bulk_update.category:
+            complaint.category = bulk_update.category
+        
+        if bulk_update.status == ComplaintStatus.ESCALATED and not bulk_update.assigned_to:
+            try:
+                escalated_to = assignment_service.pick_officer(
+                    db, complaint.ward, complaint.category,
+                    exclude=[complaint.assigned_to] if complaint.assigned_to else [],
+                    pending=escalation_picks
+                )
+            except Exception as e:
+                print(f"Escalation assignment error for complaint {complaint.id}: {e}")
+                escalated_to = None
+            if escalated_to:
+                complaint.assigned_to = escalated_to
+                escalation_picks[escalated_to] = escalation_picks.get(escalated_to, 0) + 1
+        
+        audit_entries.append({
+            "complaint_id": complaint.id,
+            "user_id": current_user.id,
+            "action_type": "UPDATED",
+            "previous_state": previous_status,
+            "new_state": complaint.status.value,
+            "details": {"updated_by": current_user.email, "bulk": True},
+            "ip_address": request.client.host
+        })
+        
+        if bulk_update.status and complaint.citizen:
+            notifications.append(Notification(
+                user_id=complaint.citizen_id,
+                complaint_id=complaint.id,
+                message=f"Complaint {complaint.complaint_id} status changed from {previous_status} to {complaint.status.value}",
+                type="status_update"
+            ))
+            emails.append((
+                complaint.citizen.email,
+                complaint.complaint_id,
+                previous_status,
+                complaint.status.value
+            ))
+        
+        events.extend(_change_events(complaint, previous_status, previous_assignee))
+        results.append({"complaint_id": complaint_id, "success": True})
+    
+    audit_service.create_audit_logs_bulk(db, audit_entries)
+    db.add_all(notifications)
+    db.commit()
+    
+    event_bus.publish_many(events)
+    
+    # Emails go out after the response, over one SMTP connection
+    background_tasks.add_task(notification_service.send_status_updates_bulk, emails)
+    
+    updated = len(audit_entries)
+    return {"updated": updated, "failed": len(results) - updated, "results": results}
+
 @router.post("/{complaint_id}/comments", response_model=CommentResponse)
 def add_comment(
     complaint_id: int,
@@ -232,8 +573,209 @@ def add_comment(
     db.commit()
     db.refresh(db_comment)
     
+    # Internal notes are only pushed to staff
+    event_bus.publish(*complaint_event(
+        complaint, "comment_added",
+        citizen_visible=not db_comment.is_internal,
+        comment_id=db_comment.id,
+        user_id=db_comment.user_id,
+        is_internal=db_comment.is_internal
+    ))
+    
     return db_comment
 
+@router.get("/{complaint_id}/comments", response_model=List[CommentResponse])
+def list_comments(
+    complaint_id: int,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    List comments on a complaint.
+    Pages backwards (newest first) with before_id; polls for new comments
+    (oldest first) with after_id and/or since.
+    """
+    complaint = _get_complaint_for_user(db, complaint_id, current_user)
+    
+    query = db.query(Comment).filter(Comment.complaint_id == complaint.id)
+    
+    # Internal notes are never sent to citizens
+    if current_user.role == UserRole.CITIZEN:
+        query = query.filter(Comment.is_internal.is_(False))
+    
+    limit = max(1, min(limit, 200))
+    
+    if after_id is not None or since is not None:
+        if after_id is not None:
+            query = query.filter(Comment.id > after_id)
+        if since is not None:
+            query = query.filter(Comment.created_at > since)
+        return query.order_by(Comment.id.asc()).limit(limit).all()
+    
+    if before_id is not None:
+        query = query.filter(Comment.id < before_id)
+    return query.order_by(Comment.id.desc()).limit(limit).all()
+
+def upload_attachment(
+    complaint_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Upload an attachment (photo, video, audio or PDF) to a complaint"""
+    complaint = _get_complaint_for_user(db, complaint_id, current_user)
+    
+    if not file.filename or not validate_file_type(file.filename, ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    
+    # Streamed to disk in chunks and hashed on the way; identical files are stored once
+    try:
+        stored = attachment_service.store_stream(file.file)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    db_attachment = Attachment(
+        complaint_id=complaint.id,
+        file_path=stored.file_path,
+        file_type=extension_type(file.filename),
+        original_filename=os.path.basename(file.filename),
+        file_size=stored.file_size,
+        content_hash=stored.content_hash,
+        uploaded_by=current_user.id
+    )
+    
+    db.add(db_attachment)
+    db.commit()
+    db.refresh(db_attachment)
+    
+    background_tasks.add_task(attachment_service.post_process, db_attachment.id)
+    
+    return db_attachment
+
+# Registered with a route class that turns away oversized bodies by
+# Content-Length, before FastAPI receives and spools the multipart form
+router.add_api_route(
+    "/{complaint_id}/attachments",
+    upload_attachment,
+    methods=["POST"],
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("complaints:upload"))],
+    route_class_override=body_size_limit(attachment_service.max_file_size + MULTIPART_OVERHEAD)
+)
+
+def _variant_filename(original_filename: Optional[str], variant: str) -> Optional[str]:
+    """Download name of a derived image: the upload's name as a JPEG"""
+    if not original_filename:
+        return None
+    stem = os.path.splitext(original_filename)[0]
+    return f"{stem}.jpg" if variant == "clean" else f"{stem}_{variant}.jpg"
+
+@router.get("/{complaint_id}/attachments/{attachment_id}")
+def download_attachment(
+    complaint_id: int,
+    attachment_id: int,
+    request: Request,
+    variant: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Download an attachment; supports Range requests and conditional GET.
+    Images are served as their EXIF-stripped "clean" copy, so the location
+    in a photo's metadata is not handed out; officers, admins and the
+    uploader can ask for variant="original". Images also have
+    "thumb_<size>" variants.
+    """
+    complaint = _get_complaint_for_user(db, complaint_id, current_user)
+    
+    attachment = db.query(Attachment).filter(
+        Attachment.id == attachment_id,
+        Attachment.complaint_id == complaint.id
+    ).first()
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    
+    may_see_original = (
+        current_user.role in [UserRole.OFFICER, UserRole.ADMIN] or attachment.uploaded_by == current_user.id
+    )
+    if variant == ORIGINAL_VARIANT:
+        if not may_see_original:
+            raise HTTPException(status_code=403, detail="Access denied")
+    elif variant is None and attachment.file_type.startswith("image/"):
+        if attachment.processed_at:
+            variant = "clean"
+        elif not may_see_original:
+            # The clean copy does not exist yet and the original may carry GPS data
+            raise HTTPException(status_code=404, detail="Attachment is still being processed")
+    
+    if variant and variant != ORIGINAL_VARIANT:
+        if variant not in VARIANTS:
+            raise HTTPException(status_code=400, detail="Unknown variant")
+        if not attachment.processed_at:
+            raise HTTPException(status_code=404, detail="Variant not available")
+        
+        file_path = image_service.variant_path(attachment.content_hash, variant)
+        return file_response(
+            request,
+            attachment_service.absolute_path(file_path),
+            file_path,
+            "image/jpeg",
+            content_hash=f"{attachment.content_hash}-{variant}",
+            filename=_variant_filename(attachment.original_filename, variant)
+        )
+    
+    return file_response(
+        request,
+        attachment_service.absolute_path(attachment.file_path),
+        attachment.file_path,
+        served_type(attachment.file_type),
+        content_hash=attachment.content_hash,
+        filename=attachment.original_filename
+    )
+
+@router.get(
+    "/{complaint_id}/attachments/{attachment_id}/similar",
+    response_model=List[SimilarAttachmentResponse]
+)
+def find_similar_attachments(
+    complaint_id: int,
+    attachment_id: int,
+    max_distance: int = 6,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Find near-duplicate photos from other complaints in the same ward (officer/admin only)"""
+    if current_user.role not in [UserRole.OFFICER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not 0 <= max_distance <= MAX_DUPLICATE_DISTANCE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_distance must be between 0 and {MAX_DUPLICATE_DISTANCE}"
+        )
+    
+    attachment = db.query(Attachment).filter(
+        Attachment.id == attachment_id,
+        Attachment.complaint_id == complaint_id
+    ).first()
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    
+    return [
+        {
+            "attachment_id": match.id,
+            "complaint_id": match.complaint_id,
+            "distance": distance
+        }
+        for match, distance in image_service.find_similar(db, attachment, max_distance)
+    ]
+
 @router.post("/{complaint_id}/feedback", response_model=FeedbackResponse)
 def submit_feedback(
     complaint_id: int,
@@ -269,9 +811,12 @@ def submit_feedback(
     db.add(db_feedback)
     
     # Update complaint status to closed
+    previous_status = complaint.status.value
     complaint.status = ComplaintStatus.CLOSED
     
     db.commit()
     db.refresh(db_feedback)
     
+    event_bus.publish_many(_change_events(complaint, previous_status, complaint.assigned_to))
+    
     return db_feedback
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from typing import List, Optional
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.user import User, UserRole
+from ..services.event_bus import event_bus, user_channel, ADMIN_CHANNEL
+from ..utils.security import get_user_from_token
+import asyncio
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+settings = get_settings()
+
+# EventSource cannot send headers, so the token may also come as ?token=
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
+
+def _authenticate(token: Optional[str]) -> Optional[User]:
+    """Resolve a token without holding a pooled connection for the stream's lifetime"""
+    if not token:
+        return None
+    db = SessionLocal()
+    try:
+        user = get_user_from_token(token, db)
+        if not user or not user.is_verified:
+            return None
+        if user in db:
+            db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+def _channels_for(user: User) -> List[str]:
+    channels = [user_channel(user.id)]
+    if user.role == UserRole.ADMIN:
+        channels.append(ADMIN_CHANNEL)
+    return channels
+
+async def _sse_stream(request: Request, channels: List[str]):
+    subscription = event_bus.subscribe(channels)
+    try:
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            payload = await subscription.get(settings.EVENT_KEEPALIVE_SECONDS)
+            if payload is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"data: {payload}\n\n"
+    finally:
+        subscription.close()
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = None,
+    bearer_token: Optional[str] = Depends(optional_oauth2_scheme)
+):
+    """Server-Sent Events stream of status, assignment and comment events for the current user"""
+    user = await run_in_threadpool(_authenticate, bearer_token or token)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return StreamingResponse(
+        _sse_stream(request, _channels_for(user)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, token: Optional[str] = None):
+    """WebSocket stream of the same events as /stream; authenticate with ?token="""
+    user = await run_in_threadpool(_authenticate, token)
+    if not user:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = event_bus.subscribe(_channels_for(user))
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.get(settings.EVENT_KEEPALIVE_SECONDS))
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                break
+            payload = next_event.result()
+            if payload is not None:
+                await websocket.send_text(payload)
+    finally:
+        disconnected.cancel()
+        subscription.close()
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..models.user import User, UserRole
+from ..utils.security import get_current_active_user
+from ..services.rate_limit_service import rate_limit_service, inference_gate
+from ..services.principal_cache import principal_cache
+from ..services.analytics_cache import analytics_cache
+from ..services.token_revocation_service import token_revocation_service
+
+router = APIRouter(prefix="/api/system", tags=["System"])
+
+def _require_admin(current_user: User):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+@router.get("/limits")
+def get_limit_stats(current_user: User = Depends(get_current_active_user)):
+    """Rate limit and inference admission counters for this worker"""
+    _require_admin(current_user)
+    
+    return {
+        "rate_limits": rate_limit_service.stats(),
+        "inference": inference_gate.stats()
+    }
+
+@router.get("/principal-cache")
+def get_principal_cache_stats(current_user: User = Depends(get_current_active_user)):
+    """Hit and miss counters of this worker's authenticated-user cache"""
+    _require_admin(current_user)
+    
+    return principal_cache.stats()
+
+@router.get("/analytics-cache")
+def get_analytics_cache_stats(current_user: User = Depends(get_current_active_user)):
+    """Hit rate and query times of this worker's analytics response cache"""
+    _require_admin(current_user)
+    
+    return analytics_cache.stats()
+
+@router.get("/revocations")
+def get_revocation_stats(current_user: User = Depends(get_current_active_user)):
+    """Size and freshness of this worker's in-memory token revocation state"""
+    _require_admin(current_user)
+    
+    return token_revocation_service.stats()
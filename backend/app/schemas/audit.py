@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+class AuditAnchorResponse(BaseModel):
+    id: int
+    first_log_id: int
+    last_log_id: int
+    size: int
+    root: str
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class InclusionProofResponse(BaseModel):
+    log_id: int
+    log_hash: str
+    anchor_id: int
+    root: str
+    tree_size: int
+    leaf_index: int
+    proof: List[str]
+
+class ProofVerificationRequest(BaseModel):
+    log_id: int
+    log_hash: str
+    root: str
+    tree_size: int
+    leaf_index: int
+    proof: List[str]
+
+class ProofVerificationResponse(BaseModel):
+    valid: bool
+    anchor_id: Optional[int] = None  # the published anchor with this root, if any
+
+class AuditEntryResponse(BaseModel):
+    id: int
+    complaint_id: int
+    user_id: int
+    action_type: str
+    previous_state: Optional[str] = None
+    new_state: Optional[str] = None
+    details: Dict[str, Any] = {}
+    hash: str
+    previous_hash: Optional[str] = None
+    hash_version: int
+    timestamp: Optional[datetime] = None
+    archived: bool = False
+
+class AuditHistoryResponse(BaseModel):
+    complaint_id: int
+    entries: List[AuditEntryResponse]
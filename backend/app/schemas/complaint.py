@@ -29,11 +29,30 @@ class ComplaintResponse(ComplaintBase):
     class Config:
         from_attributes = True
 
+class WorkQueueItem(ComplaintResponse):
+    urgency_score: float
+
 class ComplaintUpdate(BaseModel):
     status: Optional[ComplaintStatus] = None
     assigned_to: Optional[int] = None
     category: Optional[ComplaintCategory] = None
 
+class BulkComplaintUpdate(BaseModel):
+    complaint_ids: List[int]
+    status: Optional[ComplaintStatus] = None
+    assigned_to: Optional[int] = None
+    category: Optional[ComplaintCategory] = None
+
+class BulkUpdateItemResult(BaseModel):
+    complaint_id: int
+    success: bool
+    detail: Optional[str] = None
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkUpdateItemResult]
+
 class CommentCreate(BaseModel):
     comment_text: str
     is_internal: bool = False
@@ -49,6 +68,25 @@ class CommentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AttachmentResponse(BaseModel):
+    id: int
+    complaint_id: int
+    file_type: str
+    original_filename: Optional[str] = None
+    file_size: Optional[int] = None
+    content_hash: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    uploaded_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class SimilarAttachmentResponse(BaseModel):
+    attachment_id: int
+    complaint_id: int
+    distance: int
+
 class FeedbackCreate(BaseModel):
     rating: int  # 1-5
     feedback_text: Optional[str] = None
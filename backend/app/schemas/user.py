@@ -1,13 +1,15 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from ..models.user import UserRole
+from ..models.complaint import ComplaintCategory
 
 class UserBase(BaseModel):
     email: EmailStr
     full_name: str
     phone: Optional[str] = None
     ward: Optional[str] = None
+    department: Optional[ComplaintCategory] = None
     address: Optional[str] = None
 
 class UserCreate(UserBase):
@@ -30,6 +32,22 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class ProvisionRowResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    success: bool
+    user_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class ProvisionResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[ProvisionRowResult]
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -0,0 +1,178 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Callable, Hashable, Iterable
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.complaint import Complaint, Feedback
+from .cache_service import cache_service
+from .event_bus import event_bus
+from .rollup_service import ROLLUP_ATTRS
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ANALYTICS_CHANNEL = "system:analytics"
+GENERATION_KEY = "analytics:generation"
+GENERATION_TTL = 7 * 86400
+LOCK_POLL_SECONDS = 0.05
+
+# Complaint fields any analytics response depends on
+ANALYTICS_ATTRS = ROLLUP_ATTRS + ("assigned_to",)
+
+
+def _json_default(value):
+    # Database aggregates can come back as Decimal; respond with numbers like FastAPI does
+    return float(value) if isinstance(value, Decimal) else str(value)
+
+
+class AnalyticsCache:
+    """
+    Analytics responses in the shared cache (Redis, or in-process when
+    Redis is unavailable), keyed by endpoint and parameters.
+
+    Keys include a generation stored next to them. Committing a change to
+    complaints or feedback replaces the generation, which orphans every
+    cached response at once; the orphans expire after the TTL. The change
+    is also broadcast on the event bus so workers using their in-process
+    fallback drop theirs too. A response computed under an older generation
+    is stored under that generation's keys, where nobody reads it.
+
+    When an entry is missing, one worker takes a short lock and computes it
+    while the others wait for its result instead of running the same
+    queries.
+    """
+
+    def __init__(self, ttl: int, lock_seconds: int):
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.invalidations = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.max_query_seconds = 0.0
+
+    def _generation(self) -> str:
+        generation = cache_service.get(GENERATION_KEY)
+        if generation is None:
+            cache_service.set_if_absent(GENERATION_KEY, uuid.uuid4().hex, GENERATION_TTL)
+            generation = cache_service.get(GENERATION_KEY) or ""
+        return generation
+
+    @staticmethod
+    def _key(generation: str, parts: Iterable[Hashable]) -> str:
+        return f"analytics:{generation}:" + ":".join(str(part) for part in parts)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _compute(self, compute: Callable[[], dict]) -> dict:
+        started = time.perf_counter()
+        value = compute()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += elapsed
+            self.max_query_seconds = max(self.max_query_seconds, elapsed)
+        return value
+
+    def get_or_compute(self, parts: Iterable[Hashable], compute: Callable[[], dict]) -> dict:
+        """Cached response for an endpoint and its parameters, computed with compute() on a miss"""
+        if self.ttl <= 0:
+            return self._compute(compute)
+
+        key = self._key(self._generation(), parts)
+        cached = cache_service.get(key)
+        if cached is not None:
+            self._count("hits")
+            return json.loads(cached)
+        self._count("misses")
+
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_seconds
+        while not cache_service.set_if_absent(lock_key, "1", self.lock_seconds):
+            # Another worker is computing this entry; use its result when it lands
+            if time.monotonic() >= deadline:
+                return self._compute(compute)
+            time.sleep(LOCK_POLL_SECONDS)
+            cached = cache_service.get(key)
+            if cached is not None:
+                self._count("waits")
+                return json.loads(cached)
+
+        try:
+            value = self._compute(compute)
+            cache_service.set(key, json.dumps(value, default=_json_default), self.ttl)
+        finally:
+            cache_service.delete(lock_key)
+        return value
+
+    def invalidate(self, broadcast: bool = True):
+        """Orphan every cached response; broadcast=True also tells the other workers"""
+        if broadcast:
+            self._count("invalidations")
+            cache_service.set(GENERATION_KEY, uuid.uuid4().hex, GENERATION_TTL)
+            event_bus.publish([ANALYTICS_CHANNEL], {"type": "analytics_invalidated"})
+        else:
+            # Other workers share the Redis generation; only their fallback store is local
+            cache_service.memory.set(GENERATION_KEY, uuid.uuid4().hex, GENERATION_TTL)
+
+    def _on_event(self, payload: str):
+        self.invalidate(broadcast=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": cache_service.backend,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "waited_for_other_worker": self.waits,
+            "hit_rate": round((self.hits + self.waits) / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+            "queries": self.queries,
+            "avg_query_ms": round(self.query_seconds / self.queries * 1000, 2) if self.queries else None,
+            "max_query_ms": round(self.max_query_seconds * 1000, 2)
+        }
+
+
+analytics_cache = AnalyticsCache(settings.ANALYTICS_CACHE_TTL_SECONDS, settings.ANALYTICS_CACHE_LOCK_SECONDS)
+event_bus.add_listener(ANALYTICS_CHANNEL, analytics_cache._on_event)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_analytics_changes(session, flush_context):
+    """Note flushes that create or change complaints or feedback; the cache is dropped on commit"""
+    if session.info.get("analytics_stale"):
+        return
+    changed = [obj for obj in list(session.new) + list(session.deleted) if isinstance(obj, (Complaint, Feedback))]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, Feedback) or isinstance(obj, Complaint) and any(
+            inspect(obj).attrs[attr].history.has_changes() for attr in ANALYTICS_ATTRS
+        )
+    ]
+    if changed:
+        session.info["analytics_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_analytics(session):
+    if session.info.pop("analytics_stale", False):
+        analytics_cache.invalidate()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_analytics_changes(session, transaction):
+    # A rolled-back savepoint must not clear the mark the outer commit still needs
+    if transaction.parent is not None:
+        return
+    session.info.pop("analytics_stale", None)
@@ -0,0 +1,250 @@
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.complaint import Complaint, ComplaintCategory, OPEN_STATUSES
+from ..models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PoolKey = Tuple[Optional[str], Optional[str]]  # (ward, department)
+
+
+class OfficerLoadIndex:
+    """
+    Open complaint count per officer, with a min-heap of (load, officer_id)
+    per (ward, department) pool. Load changes push a new heap entry and
+    stale entries are dropped when they surface, so picking the least
+    loaded officer is O(log n) amortized.
+    """
+
+    def __init__(self):
+        self._loads: Dict[int, int] = {}
+        self._officer_pools: Dict[int, PoolKey] = {}
+        self._pools: Dict[PoolKey, List[Tuple[int, int]]] = {}
+
+    def add_officer(self, officer_id: int, ward: Optional[str], department: Optional[str], load: int = 0):
+        pool_key = (ward, department)
+        self._loads[officer_id] = load
+        self._officer_pools[officer_id] = pool_key
+        heapq.heappush(self._pools.setdefault(pool_key, []), (load, officer_id))
+
+    def adjust(self, officer_id: int, delta: int):
+        if officer_id not in self._loads or delta == 0:
+            return
+        load = max(self._loads[officer_id] + delta, 0)
+        self._loads[officer_id] = load
+        pool_key = self._officer_pools[officer_id]
+        heap = self._pools[pool_key]
+        heapq.heappush(heap, (load, officer_id))
+        if len(heap) > 4 * len(self._loads) + 64:
+            self._compact(pool_key)
+
+    def load_of(self, officer_id: int) -> Optional[int]:
+        return self._loads.get(officer_id)
+
+    def least_loaded(
+        self,
+        pool_key: PoolKey,
+        exclude: Iterable[int] = (),
+        pending: Optional[Dict[int, int]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Return (load, officer_id) of the least loaded officer in a pool.
+        `pending` holds extra load not yet committed (e.g. earlier picks in
+        the same batch); entries are scanned in load order only until no
+        remaining officer can beat the best effective load.
+        """
+        heap = self._pools.get(pool_key)
+        if not heap:
+            return None
+
+        pending = pending or {}
+        popped = []
+        best = None
+        while heap:
+            load, officer_id = heap[0]
+            if self._loads.get(officer_id) != load or self._officer_pools.get(officer_id) != pool_key:
+                heapq.heappop(heap)  # stale entry
+                continue
+            if best is not None and load >= best[0]:
+                break
+            popped.append(heapq.heappop(heap))
+            if officer_id in exclude:
+                continue
+            effective_load = load + pending.get(officer_id, 0)
+            if best is None or effective_load < best[0]:
+                best = (effective_load, officer_id)
+
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return best
+
+    def _compact(self, pool_key: PoolKey):
+        heap = [
+            (load, officer_id)
+            for officer_id, load in self._loads.items()
+            if self._officer_pools[officer_id] == pool_key
+        ]
+        heapq.heapify(heap)
+        self._pools[pool_key] = heap
+
+
+def _open_assignment(assigned_to, complaint_status) -> Optional[int]:
+    """Officer whose open load a complaint counts towards, if any"""
+    if assigned_to and complaint_status in OPEN_STATUSES:
+        return assigned_to
+    return None
+
+
+def _previous_value(state, attr: str):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else None
+
+
+class AssignmentService:
+    """
+    Picks an officer for new and escalated complaints from the complaint's
+    ward and category and the officers' current open load.
+
+    The load index lives in memory and is updated incrementally from ORM
+    flushes once their transaction commits. Each worker rebuilds it from
+    the database every ASSIGNMENT_RESYNC_SECONDS to pick up assignments
+    made by other workers.
+    """
+
+    def __init__(self, resync_seconds: int):
+        self.resync_seconds = resync_seconds
+        self._lock = threading.Lock()
+        self._index: Optional[OfficerLoadIndex] = None
+        self._loaded_at = 0.0
+
+    def _ensure_loaded(self, db: Session):
+        if self._index is not None and time.monotonic() - self._loaded_at < self.resync_seconds:
+            return
+
+        officers = db.query(User.id, User.ward, User.department).filter(
+            User.role == UserRole.OFFICER,
+            User.is_verified.is_(True)
+        ).all()
+        loads = dict(
+            db.query(Complaint.assigned_to, func.count(Complaint.id)).filter(
+                Complaint.assigned_to.isnot(None),
+                Complaint.status.in_(OPEN_STATUSES)
+            ).group_by(Complaint.assigned_to).all()
+        )
+
+        index = OfficerLoadIndex()
+        for officer_id, ward, department in officers:
+            index.add_officer(
+                officer_id,
+                ward,
+                department.value if department else None,
+                loads.get(officer_id, 0)
+            )
+
+        with self._lock:
+            self._index = index
+            self._loaded_at = time.monotonic()
+        logger.info(f"Officer load index loaded: {len(officers)} officers")
+
+    def pick_officer(
+        self,
+        db: Session,
+        ward: str,
+        category: ComplaintCategory,
+        exclude: Iterable[int] = (),
+        pending: Optional[Dict[int, int]] = None
+    ) -> Optional[int]:
+        """
+        Least loaded officer for a ward and category. Specialists for the
+        category win ties against generalists; officers without a ward are
+        only used when the ward has none. Callers assigning several
+        complaints before committing pass their picks so far in `pending`.
+        """
+        self._ensure_loaded(db)
+        exclude = set(exclude)
+
+        with self._lock:
+            for pool_ward in (ward, None):
+                candidates = [
+                    self._index.least_loaded((pool_ward, category.value), exclude, pending),
+                    self._index.least_loaded((pool_ward, None), exclude, pending)
+                ]
+                candidates = [c for c in candidates if c]
+                if candidates:
+                    # min() keeps the first (specialist) entry on equal load
+                    return min(candidates, key=lambda c: c[0])[1]
+        return None
+
+    def apply(self, deltas: Dict[int, int], new_officers: List[Tuple[int, Optional[str], Optional[str]]]):
+        """Apply committed load changes and newly registered officers"""
+        with self._lock:
+            if self._index is None:
+                return
+            for officer_id, ward, department in new_officers:
+                if self._index.load_of(officer_id) is None:
+                    self._index.add_officer(officer_id, ward, department)
+            for officer_id, delta in deltas.items():
+                self._index.adjust(officer_id, delta)
+
+
+assignment_service = AssignmentService(settings.ASSIGNMENT_RESYNC_SECONDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_load_changes(session, flush_context):
+    """Record how flushed complaints change officer loads; applied on commit"""
+    deltas = session.info.setdefault("officer_load_deltas", {})
+    new_officers = session.info.setdefault("new_officers", [])
+
+    for obj in session.new:
+        if isinstance(obj, Complaint):
+            officer_id = _open_assignment(obj.assigned_to, obj.status)
+            if officer_id:
+                deltas[officer_id] = deltas.get(officer_id, 0) + 1
+        elif isinstance(obj, User) and obj.role == UserRole.OFFICER and obj.is_verified:
+            new_officers.append((obj.id, obj.ward, obj.department.value if obj.department else None))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Complaint):
+            continue
+        state = inspect(obj)
+        before = _open_assignment(_previous_value(state, "assigned_to"), _previous_value(state, "status"))
+        after = _open_assignment(obj.assigned_to, obj.status)
+        if before != after:
+            if before:
+                deltas[before] = deltas.get(before, 0) - 1
+            if after:
+                deltas[after] = deltas.get(after, 0) + 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Complaint):
+            officer_id = _open_assignment(obj.assigned_to, obj.status)
+            if officer_id:
+                deltas[officer_id] = deltas.get(officer_id, 0) - 1
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_load_changes(session):
+    deltas = session.info.pop("officer_load_deltas", {})
+    new_officers = session.info.pop("new_officers", [])
+    if deltas or new_officers:
+        assignment_service.apply(deltas, new_officers)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_load_changes(session, transaction):
+    # Not after_rollback: that also fires when a savepoint rolls back and the
+    # outer transaction goes on to commit. Runs after after_commit.
+    if transaction.parent is not None:
+        return
+    session.info.pop("officer_load_deltas", None)
+    session.info.pop("new_officers", None)
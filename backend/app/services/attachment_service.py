@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.complaint import Attachment
+from .image_service import image_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024  # 64KB
+
+# Uploadable extensions and the type stored for them until the bytes are sniffed.
+# The client's Content-Type header is never stored: it could declare text/html.
+EXTENSION_TYPES = {
+    ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".gif": "image/gif", ".webp": "image/webp",
+    ".pdf": "application/pdf",
+    ".mp4": "video/mp4", ".mov": "video/quicktime", ".3gp": "video/3gpp",
+    ".mp3": "audio/mpeg", ".wav": "audio/wav", ".m4a": "audio/mp4"
+}
+ALLOWED_EXTENSIONS = list(EXTENSION_TYPES)
+
+# (offset, signature, mime type) checked against the first bytes of a file
+MAGIC_SIGNATURES = [
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"ID3", "audio/mpeg"),
+    (4, b"ftypqt", "video/quicktime"),
+    (4, b"ftyp3g", "video/3gpp"),
+    (4, b"ftypM4A", "audio/mp4"),
+    (4, b"ftyp", "video/mp4"),
+]
+
+STORED_TYPES = set(EXTENSION_TYPES.values()) | {mime_type for _, _, mime_type in MAGIC_SIGNATURES}
+
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_FILE_SIZE"""
+
+
+@dataclass
+class StoredFile:
+    content_hash: str
+    file_path: str  # relative to UPLOAD_DIR
+    file_size: int
+    deduplicated: bool
+
+
+def extension_type(filename: str) -> str:
+    """Type of an allowed extension; anything else is served as opaque bytes"""
+    return EXTENSION_TYPES.get(os.path.splitext(filename.lower())[1], "application/octet-stream")
+
+
+def served_type(file_type: str) -> str:
+    """Stored type to serve, or opaque bytes for types no upload should have (older rows)"""
+    return file_type if file_type in STORED_TYPES else "application/octet-stream"
+
+
+def sniff_mime_type(header: bytes) -> Optional[str]:
+    """Detect file type from its leading bytes"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "audio/wav"
+    for offset, signature, mime_type in MAGIC_SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            return mime_type
+    return None
+
+
+class AttachmentService:
+    def __init__(self, upload_dir: str, max_file_size: int):
+        self.upload_dir = upload_dir
+        self.max_file_size = max_file_size
+
+    @staticmethod
+    def object_path(content_hash: str) -> str:
+        """Relative path of a content-addressed object, fanned out by hash prefix"""
+        return os.path.join(content_hash[:2], content_hash[2:4], content_hash)
+
+    def absolute_path(self, file_path: str) -> str:
+        return os.path.join(self.upload_dir, file_path)
+
+    def store_stream(self, source: BinaryIO) -> StoredFile:
+        """
+        Copy an upload to disk chunk by chunk, hashing as it streams.
+        The file is written to a temp file first and then moved to its
+        content-addressed path, so identical uploads are stored once.
+        """
+        tmp_dir = os.path.join(self.upload_dir, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_file_size:
+                        raise FileTooLargeError(
+                            f"File exceeds maximum size of {self.max_file_size} bytes"
+                        )
+                    hasher.update(chunk)
+                    tmp_file.write(chunk)
+
+            content_hash = hasher.hexdigest()
+            file_path = self.object_path(content_hash)
+            final_path = self.absolute_path(file_path)
+
+            deduplicated = os.path.exists(final_path)
+            if not deduplicated:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                # Atomic on the same filesystem; a concurrent upload of the
+                # same content just replaces identical bytes
+                os.replace(tmp_path, final_path)
+
+            return StoredFile(
+                content_hash=content_hash,
+                file_path=file_path,
+                file_size=size,
+                deduplicated=deduplicated
+            )
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def post_process(self, attachment_id: int):
+        """Background post-processing for a stored attachment"""
+        db = SessionLocal()
+        try:
+            attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
+            if not attachment:
+                return
+
+            source_path = self.absolute_path(attachment.file_path)
+
+            # The extension-based type is a guess; the stored bytes decide when they are recognised
+            with open(source_path, "rb") as f:
+                detected_type = sniff_mime_type(f.read(32))
+
+            if detected_type and detected_type != attachment.file_type:
+                attachment.file_type = detected_type
+                db.commit()
+
+            if detected_type and detected_type.startswith("image/"):
+                image_service.process_attachment(db, attachment, source_path)
+
+            logger.info(f"Attachment {attachment_id} processed ({attachment.file_type})")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Attachment post-processing error: {e}")
+        finally:
+            db.close()
+
+
+attachment_service = AttachmentService(settings.UPLOAD_DIR, settings.MAX_FILE_SIZE)
@@ -0,0 +1,123 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.complaint import AuditLog, AuditAnchor
+from ..utils.merkle import audit_leaf, merkle_root, inclusion_proof
+from .audit_archive import audit_archive
+from .event_bus import event_bus, ADMIN_CHANNEL
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AnchorMismatchError(Exception):
+    """The audit entries under an anchor no longer hash to its stored root"""
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class AuditAnchorService:
+    """
+    Anchors the audit log in consecutive id ranges of up to batch_size
+    entries. Each range gets a Merkle tree over its entries' hashes and
+    the root is stored in audit_anchors, so any entry can later be proven
+    part of a published root with log2(batch_size) sibling hashes.
+    """
+
+    def __init__(self, batch_size: int, settle_seconds: int):
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+
+    def anchor_pending(self, db: Session) -> List[AuditAnchor]:
+        """Anchor every settled entry after the last anchor. Commits each anchor."""
+        last_anchored = db.query(func.max(AuditAnchor.last_log_id)).scalar() or 0
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds)
+        anchors, published = [], []
+
+        while True:
+            rows = db.query(AuditLog.id, AuditLog.hash, AuditLog.timestamp).filter(
+                AuditLog.id > last_anchored
+            ).order_by(AuditLog.id).limit(self.batch_size).all()
+
+            # Entries are anchored in id order, up to the first one too recent to be final.
+            # Undated (legacy) entries count as settled so they cannot hold up the rest.
+            settled = []
+            for log_id, log_hash, timestamp in rows:
+                if timestamp is not None and _as_utc(timestamp) > cutoff:
+                    break
+                settled.append((log_id, log_hash))
+            if not settled:
+                break
+
+            root = merkle_root([audit_leaf(log_id, log_hash) for log_id, log_hash in settled])
+            anchor = AuditAnchor(
+                first_log_id=last_anchored + 1,
+                last_log_id=settled[-1][0],
+                size=len(settled),
+                root=root.hex()
+            )
+            db.add(anchor)
+            db.flush()
+            published.append({"id": anchor.id, "last_log_id": anchor.last_log_id, "root": anchor.root})
+            db.commit()
+            anchors.append(anchor)
+            last_anchored = settled[-1][0]
+
+            if len(settled) < self.batch_size:
+                break
+
+        if anchors:
+            logger.info(f"Anchored audit log up to entry {last_anchored} in {len(anchors)} trees")
+            event_bus.publish([ADMIN_CHANNEL], {
+                "type": "audit_anchored",
+                "anchors": published,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        return anchors
+
+    @staticmethod
+    def anchor_for(db: Session, log_id: int) -> Optional[AuditAnchor]:
+        return db.query(AuditAnchor).filter(
+            AuditAnchor.first_log_id <= log_id,
+            AuditAnchor.last_log_id >= log_id
+        ).first()
+
+    def inclusion_proof(self, db: Session, log_id: int, log_hash: str, anchor: AuditAnchor) -> dict:
+        """
+        Proof that an entry is under an anchor's root. Raises
+        AnchorMismatchError if the anchored entries have been altered.
+        """
+        archived = [
+            (entry["id"], entry["hash"])
+            for entry in audit_archive.entries_between(db, anchor.first_log_id, anchor.last_log_id)
+        ]
+        rows = archived + db.query(AuditLog.id, AuditLog.hash).filter(
+            AuditLog.id >= anchor.first_log_id,
+            AuditLog.id <= anchor.last_log_id
+        ).order_by(AuditLog.id).all()
+
+        leaves = [audit_leaf(row_id, row_hash) for row_id, row_hash in rows]
+        if len(leaves) != anchor.size or merkle_root(leaves).hex() != anchor.root:
+            raise AnchorMismatchError(f"Audit entries under anchor {anchor.id} do not match its root")
+
+        index = [row_id for row_id, _ in rows].index(log_id)
+        return {
+            "log_id": log_id,
+            "log_hash": log_hash,
+            "anchor_id": anchor.id,
+            "root": anchor.root,
+            "tree_size": anchor.size,
+            "leaf_index": index,
+            "proof": [node.hex() for node in inclusion_proof(leaves, index)]
+        }
+
+
+audit_anchor_service = AuditAnchorService(
+    settings.AUDIT_ANCHOR_BATCH_SIZE,
+    settings.AUDIT_ANCHOR_SETTLE_SECONDS
+)
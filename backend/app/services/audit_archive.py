@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.complaint import AuditArchiveSegment
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SEGMENT_FORMAT = 1
+INDEX_SUFFIX = ".idx"
+
+# Audit log columns kept in a segment, in stored order; segments written
+# before details_text existed end at timestamp
+ARCHIVE_COLUMNS = (
+    "id", "complaint_id", "user_id", "action_type", "previous_state", "new_state",
+    "details", "ip_address", "hash", "previous_hash", "hash_version", "timestamp",
+    "details_text"
+)
+
+
+class ArchiveCorruptError(Exception):
+    """A segment or its index is missing, unreadable or no longer matches the registry"""
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_block(rows: List[dict]) -> bytes:
+    """Compress one complaint's entries (dicts with ARCHIVE_COLUMNS, timestamp as ISO text)"""
+    values = [[row[column] for column in ARCHIVE_COLUMNS] for row in rows]
+    return zlib.compress(json.dumps(values, separators=(",", ":")).encode(), 6)
+
+
+def decode_block(data: bytes) -> List[dict]:
+    return [dict(zip(ARCHIVE_COLUMNS, values)) for values in json.loads(zlib.decompress(data))]
+
+
+class SegmentWriter:
+    """
+    Writes one segment: a file of zlib blocks, one per complaint, and a
+    JSON index mapping each complaint to its block's offset and to the
+    hashes its chain starts from and ends at. Both files are written under
+    temporary names and only renamed into place by finish().
+    """
+
+    def __init__(self, directory: str, name: str, period: str):
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._file = open(self.path + ".tmp", "wb")
+        self._digest = hashlib.sha256()
+        self._offset = 0
+        self.index = {
+            "format": SEGMENT_FORMAT,
+            "period": period,
+            "columns": list(ARCHIVE_COLUMNS),
+            "entries": 0,
+            "complaints": {}
+        }
+
+    def add_block(self, complaint_id: int, rows: List[dict], start_hash: str):
+        data = encode_block(rows)
+        self._file.write(data)
+        self._digest.update(data)
+        self.index["complaints"][str(complaint_id)] = {
+            "offset": self._offset,
+            "length": len(data),
+            "entries": len(rows),
+            "first_log_id": rows[0]["id"],
+            "last_log_id": rows[-1]["id"],
+            "start_hash": start_hash,
+            "last_hash": rows[-1]["hash"]
+        }
+        self._offset += len(data)
+        self.index["entries"] += len(rows)
+
+    def finish(self, first_log_id: int, last_log_id: int) -> Tuple[str, str]:
+        """Make the segment durable and visible; returns (segment sha256, index sha256)"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        self.index.update(first_log_id=first_log_id, last_log_id=last_log_id)
+        index_data = json.dumps(self.index, separators=(",", ":")).encode()
+        with open(self.path + INDEX_SUFFIX + ".tmp", "wb") as f:
+            f.write(index_data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(self.path + ".tmp", self.path)
+        os.replace(self.path + INDEX_SUFFIX + ".tmp", self.path + INDEX_SUFFIX)
+        return self._digest.hexdigest(), hashlib.sha256(index_data).hexdigest()
+
+    def abort(self):
+        self._file.close()
+        for path in (self.path + ".tmp", self.path + INDEX_SUFFIX + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class AuditArchive:
+    """
+    Reads archived audit entries. Segments are immutable, so each index is
+    checked against the registry's checksum once per process and cached.
+    Hashing whole segment files is left to verify_segment, which the
+    verifier and the archiver run; requests only read the blocks they need,
+    and entries they serve are still checked against their anchor's root.
+    Entries come back as dicts keyed by ARCHIVE_COLUMNS.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, dict] = {}
+
+    @staticmethod
+    def segments(db: Session) -> List[AuditArchiveSegment]:
+        return db.query(AuditArchiveSegment).order_by(AuditArchiveSegment.first_log_id).all()
+
+    def index(self, segment: AuditArchiveSegment) -> dict:
+        index = self._indexes.get(segment.path)
+        if index is not None:
+            return index
+
+        path = os.path.join(self.directory, segment.path)
+        try:
+            with open(path + INDEX_SUFFIX, "rb") as f:
+                index_data = f.read()
+        except FileNotFoundError:
+            raise ArchiveCorruptError(f"Index of audit archive segment {segment.path} is missing")
+
+        if hashlib.sha256(index_data).hexdigest() != segment.index_sha256:
+            raise ArchiveCorruptError(f"Index of audit archive segment {segment.path} was modified")
+
+        index = json.loads(index_data)
+        with self._lock:
+            self._indexes[segment.path] = index
+        return index
+
+    def verify_segment(self, segment: AuditArchiveSegment):
+        """Check a whole segment file and its index against the registry's checksums"""
+        try:
+            segment_sha256 = _file_sha256(os.path.join(self.directory, segment.path))
+        except FileNotFoundError:
+            raise ArchiveCorruptError(f"Audit archive segment {segment.path} is missing")
+        if segment_sha256 != segment.sha256:
+            raise ArchiveCorruptError(f"Audit archive segment {segment.path} was modified")
+        self.index(segment)
+
+    def read_block(self, segment: AuditArchiveSegment, entry: dict) -> List[dict]:
+        try:
+            with open(os.path.join(self.directory, segment.path), "rb") as f:
+                f.seek(entry["offset"])
+                return decode_block(f.read(entry["length"]))
+        except FileNotFoundError:
+            raise ArchiveCorruptError(f"Audit archive segment {segment.path} is missing")
+        except (zlib.error, ValueError):
+            raise ArchiveCorruptError(f"Audit archive segment {segment.path} has an unreadable block")
+
+    def complaint_entries(self, db: Session, complaint_id: int) -> List[dict]:
+        """All archived entries of one complaint, in id order"""
+        rows = []
+        for segment in self.segments(db):
+            entry = self.index(segment)["complaints"].get(str(complaint_id))
+            if entry:
+                rows.extend(self.read_block(segment, entry))
+        return rows
+
+    def chain_tips(self, db: Session) -> Dict[int, str]:
+        """Hash of the last archived entry of every complaint with archived entries"""
+        tips = {}
+        for segment in self.segments(db):
+            for complaint_id, entry in self.index(segment)["complaints"].items():
+                tips[int(complaint_id)] = entry["last_hash"]
+        return tips
+
+    def entries_between(self, db: Session, first_log_id: int, last_log_id: int) -> List[dict]:
+        """Archived entries with ids in [first_log_id, last_log_id], in id order"""
+        segments = db.query(AuditArchiveSegment).filter(
+            AuditArchiveSegment.first_log_id <= last_log_id,
+            AuditArchiveSegment.last_log_id >= first_log_id
+        ).all()
+
+        rows = []
+        for segment in segments:
+            for entry in self.index(segment)["complaints"].values():
+                if entry["first_log_id"] <= last_log_id and entry["last_log_id"] >= first_log_id:
+                    rows.extend(
+                        row for row in self.read_block(segment, entry)
+                        if first_log_id <= row["id"] <= last_log_id
+                    )
+        return sorted(rows, key=lambda row: row["id"])
+
+    def entry(self, db: Session, log_id: int) -> Optional[dict]:
+        rows = self.entries_between(db, log_id, log_id)
+        return rows[0] if rows else None
+
+
+audit_archive = AuditArchive(settings.AUDIT_ARCHIVE_DIR)
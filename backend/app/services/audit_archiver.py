@@ -0,0 +1,142 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.complaint import AuditLog, AuditAnchor, AuditArchiveSegment
+from .audit_archive import AuditArchive, SegmentWriter, ARCHIVE_COLUMNS, audit_archive
+from .audit_service import audit_service, archived_chain_row, verify_chain
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BATCH_ROWS = 5000  # audit rows streamed per fetch
+HEAD_CHUNK = 1000  # complaints per chain head query
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _month_end(value: datetime) -> datetime:
+    if value.month == 12:
+        return datetime(value.year + 1, 1, 1, tzinfo=timezone.utc)
+    return datetime(value.year, value.month + 1, 1, tzinfo=timezone.utc)
+
+
+class AuditArchiver:
+    """
+    Moves old audit entries out of audit_logs, a month at a time.
+
+    Each run takes the oldest live entries, up to the last entry of their
+    month, once that month ended more than after_days ago. Entries are
+    only archived after they have been anchored, so every archived entry
+    is already covered by a published Merkle root. The chains are verified
+    against the archive before anything is written; the segment is then
+    written, registered and the rows deleted in one transaction.
+    """
+
+    def __init__(self, archive: AuditArchive, after_days: int):
+        self.archive = archive
+        self.after_days = after_days
+
+    def _next_range(self, db: Session) -> Optional[Tuple[str, int, int]]:
+        """(period, first id, last id) of the next month to archive, if one is due"""
+        after = db.query(func.max(AuditArchiveSegment.last_log_id)).scalar() or 0
+        oldest = db.query(AuditLog.id, AuditLog.timestamp).filter(AuditLog.id > after).order_by(AuditLog.id).first()
+        if not oldest:
+            return None
+        if oldest[1] is None:
+            # Undated entries go with the month of the next dated entry rather than stalling the archive
+            logger.warning(f"Audit entry {oldest[0]} has no timestamp; archiving it with the next dated entry")
+            oldest = db.query(AuditLog.id, AuditLog.timestamp).filter(
+                AuditLog.id > after,
+                AuditLog.timestamp.isnot(None)
+            ).order_by(AuditLog.id).first()
+            if not oldest:
+                return None
+        oldest = oldest[1:]
+
+        month_end = _month_end(_as_utc(oldest[0]))
+        if month_end > datetime.now(timezone.utc) - timedelta(days=self.after_days):
+            return None
+
+        last_id = db.query(func.max(AuditLog.id)).filter(
+            AuditLog.id > after,
+            AuditLog.timestamp < month_end
+        ).scalar()
+        anchored = db.query(func.max(AuditAnchor.last_log_id)).scalar() or 0
+        if last_id > anchored:
+            logger.warning(f"Audit entries up to {last_id} are due for archiving but only {anchored} are anchored")
+            return None
+
+        return f"{oldest[0]:%Y-%m}", after + 1, last_id
+
+    def _archive_next(self, db: Session) -> Optional[AuditArchiveSegment]:
+        next_range = self._next_range(db)
+        if not next_range:
+            return None
+        period, first_id, last_id = next_range
+
+        tips = self.archive.chain_tips(db)
+        rows = db.query(*(getattr(AuditLog, column) for column in ARCHIVE_COLUMNS)).filter(
+            AuditLog.id.between(first_id, last_id)
+        ).order_by(AuditLog.complaint_id, AuditLog.id).yield_per(BATCH_ROWS)
+
+        writer = SegmentWriter(self.archive.directory, f"audit-{period}-{first_id}.seg", period)
+        try:
+            for complaint_id, group in groupby(rows, key=lambda row: row.complaint_id):
+                entries = [dict(row._mapping) for row in group]
+                for entry in entries:
+                    entry["timestamp"] = entry["timestamp"].isoformat() if entry["timestamp"] else None
+
+                start_hash = tips.get(complaint_id, "")
+                _, broken = verify_chain([archived_chain_row(entry) for entry in entries], start_hash)
+                if broken:
+                    raise ArchiveError(f"Complaint {complaint_id}: {broken}")
+                writer.add_block(complaint_id, entries, start_hash)
+
+            sha256, index_sha256 = writer.finish(first_id, last_id)
+        except Exception:
+            writer.abort()
+            raise
+
+        # Chain heads seeded from the log must exist before their entries leave it
+        complaint_ids = [int(c) for c in writer.index["complaints"]]
+        for start in range(0, len(complaint_ids), HEAD_CHUNK):
+            audit_service.ensure_chain_heads(db, complaint_ids[start:start + HEAD_CHUNK])
+
+        segment = AuditArchiveSegment(
+            period=period,
+            path=writer.name,
+            first_log_id=first_id,
+            last_log_id=last_id,
+            entries=writer.index["entries"],
+            sha256=sha256,
+            index_sha256=index_sha256
+        )
+        db.add(segment)
+        db.query(AuditLog).filter(AuditLog.id.between(first_id, last_id)).delete(synchronize_session=False)
+        db.commit()
+
+        logger.info(f"Archived {segment.entries} audit entries of {period} to {segment.path}")
+        return segment
+
+    def archive_pending(self, db: Session) -> List[AuditArchiveSegment]:
+        """Archive every month that is due. Commits each segment."""
+        segments = []
+        while True:
+            segment = self._archive_next(db)
+            if not segment:
+                break
+            segments.append(segment)
+        return segments
+
+
+audit_archiver = AuditArchiver(audit_archive, settings.AUDIT_ARCHIVE_AFTER_DAYS)
@@ -1,10 +1,206 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from ..models.complaint import AuditLog
-from ..utils.helpers import compute_hash
+from ..config import get_settings
+from ..models.complaint import AuditLog, AuditChainHead
+from ..utils.helpers import compute_hash, compute_hash_v2, canonical_json
+from .audit_archive import audit_archive
 import json
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+settings = get_settings()
+
+HASH_VERSIONS = (1, 2)
+
+# Column order of the rows verify_chain works on
+AUDIT_CHAIN_COLUMNS = (
+    AuditLog.id, AuditLog.complaint_id, AuditLog.user_id, AuditLog.action_type,
+    AuditLog.previous_state, AuditLog.new_state, AuditLog.details,
+    AuditLog.hash, AuditLog.previous_hash, AuditLog.hash_version, AuditLog.details_text
+)
+
+def archived_chain_row(entry: dict) -> tuple:
+    """An archived entry as an AUDIT_CHAIN_COLUMNS row; older segments have no details_text"""
+    return tuple(entry.get(column.key) for column in AUDIT_CHAIN_COLUMNS)
+
+def _details_text(details: dict, hash_version: int) -> str:
+    """The JSON text of details an entry's hash is computed from"""
+    return canonical_json(details) if hash_version == 2 else json.dumps(details)
+
+def _stored_entry_hash(version, complaint_id, user_id, action_type, previous_state, new_state, details, previous_hash, details_text=None) -> str:
+    """
+    Recompute an entry's hash from its stored columns. details_text is the
+    exact JSON text that was hashed; JSONB normalises numbers (1e16 reads
+    back as an int, -0.0 as 0.0), so details is only used for entries
+    written before details_text existed. It is then a dict from the JSON
+    column, or text from before the column held JSON.
+    """
+    if details_text is not None:
+        details = details_text
+    
+    if version == 2:
+        details_text = details if isinstance(details, str) else canonical_json(details)
+        return compute_hash_v2(
+            (complaint_id, user_id, action_type, previous_state, new_state, details_text),
+            previous_hash
+        )
+    
+    if isinstance(details, str):
+        details = json.loads(details) if details else {}
+    hash_data = {
+        "complaint_id": complaint_id,
+        "user_id": user_id,
+        "action_type": action_type,
+        "previous_state": previous_state,
+        "new_state": new_state,
+        "details": details or {}
+    }
+    return compute_hash(hash_data, previous_hash)
+
+def verify_chain(rows: Iterable[tuple], previous_hash: str = "") -> Tuple[Optional[tuple], Optional[str]]:
+    """
+    Check audit rows of one complaint (AUDIT_CHAIN_COLUMNS tuples, in id
+    order) continuing from previous_hash. Returns (last good row, None) or
+    (last good row, reason) at the first broken link; the last good row is
+    None if the first row is already broken.
+    """
+    last_good = None
+    for row in rows:
+        log_id, complaint_id, user_id, action_type, previous_state, new_state, details, log_hash, log_previous_hash, version, details_text = row
+        
+        if version not in HASH_VERSIONS:
+            return last_good, f"log {log_id}: unknown hash version {version}"
+        
+        # Verify previous hash matches
+        if log_previous_hash != previous_hash:
+            return last_good, f"log {log_id}: previous_hash does not match the preceding entry"
+        
+        # Verify hash matches
+        entry_hash = _stored_entry_hash(
+            version, complaint_id, user_id, action_type, previous_state, new_state, details, previous_hash, details_text
+        )
+        if entry_hash != log_hash:
+            return last_good, f"log {log_id}: hash does not match its contents"
+        
+        previous_hash = log_hash
+        last_good = row
+    
+    return last_good, None
 
 class AuditService:
+    @staticmethod
+    def _build_audit_log(
+        previous_hash: str,
+        complaint_id: int,
+        user_id: int,
+        action_type: str,
+        previous_state: Optional[str],
+        new_state: Optional[str],
+        details: dict,
+        ip_address: str,
+        hash_version: Optional[int] = None
+    ) -> AuditLog:
+        """Build an audit log entry chained onto previous_hash"""
+        hash_version = hash_version or settings.AUDIT_HASH_VERSION
+        
+        # Kept verbatim next to the JSON column, which may not hand back the same numbers
+        details_text = _details_text(details, hash_version)
+        if hash_version == 2:
+            current_hash = compute_hash_v2(
+                (complaint_id, user_id, action_type, previous_state, new_state, details_text),
+                previous_hash
+            )
+        else:
+            # Prepare data for hashing
+            hash_data = {
+                "complaint_id": complaint_id,
+                "user_id": user_id,
+                "action_type": action_type,
+                "previous_state": previous_state,
+                "new_state": new_state,
+                "details": details
+            }
+            
+            # Compute hash
+            current_hash = compute_hash(hash_data, previous_hash)
+        
+        return AuditLog(
+            complaint_id=complaint_id,
+            user_id=user_id,
+            action_type=action_type,
+            previous_state=previous_state,
+            new_state=new_state,
+            details=details,
+            details_text=details_text,
+            ip_address=ip_address,
+            hash=current_hash,
+            previous_hash=previous_hash,
+            hash_version=hash_version
+        )
+    
+    @staticmethod
+    def _select_heads(db: Session, complaint_ids: List[int]) -> Dict[int, AuditChainHead]:
+        heads = db.query(AuditChainHead).filter(
+            AuditChainHead.complaint_id.in_(complaint_ids)
+        ).order_by(AuditChainHead.complaint_id).with_for_update().populate_existing().all()
+        return {head.complaint_id: head for head in heads}
+    
+    @staticmethod
+    def _seed_heads(db: Session, complaint_ids: List[int]):
+        """Create chain heads from the existing log; another transaction may create them first"""
+        last_log_ids = db.query(func.max(AuditLog.id)).filter(
+            AuditLog.complaint_id.in_(complaint_ids)
+        ).group_by(AuditLog.complaint_id)
+        last_hashes = dict(
+            db.query(AuditLog.complaint_id, AuditLog.hash).filter(
+                AuditLog.id.in_(last_log_ids.scalar_subquery())
+            ).all()
+        )
+        lengths = dict(
+            db.query(AuditLog.complaint_id, func.count(AuditLog.id)).filter(
+                AuditLog.complaint_id.in_(complaint_ids)
+            ).group_by(AuditLog.complaint_id).all()
+        )
+        
+        for complaint_id in complaint_ids:
+            try:
+                with db.begin_nested():
+                    db.add(AuditChainHead(
+                        complaint_id=complaint_id,
+                        last_hash=last_hashes.get(complaint_id, ""),
+                        length=lengths.get(complaint_id, 0)
+                    ))
+            except IntegrityError:
+                pass
+    
+    @staticmethod
+    def _lock_heads(db: Session, complaint_ids: List[int]) -> Dict[int, AuditChainHead]:
+        """
+        Lock the chain heads of the given complaints until the transaction
+        ends, creating any that do not exist yet. Rows are locked in
+        complaint_id order so concurrent bulk appends cannot deadlock.
+        """
+        complaint_ids = sorted(set(complaint_ids))
+        heads = AuditService._select_heads(db, complaint_ids)
+        
+        missing = [c for c in complaint_ids if c not in heads]
+        if missing:
+            AuditService._seed_heads(db, missing)
+            heads.update(AuditService._select_heads(db, missing))
+        return heads
+    
+    @staticmethod
+    def ensure_chain_heads(db: Session, complaint_ids: List[int]):
+        """Create missing chain heads from the log, e.g. before entries are archived"""
+        existing = {
+            complaint_id for (complaint_id,) in db.query(AuditChainHead.complaint_id).filter(
+                AuditChainHead.complaint_id.in_(complaint_ids)
+            ).all()
+        }
+        missing = [c for c in complaint_ids if c not in existing]
+        if missing:
+            AuditService._seed_heads(db, missing)
+    
     @staticmethod
     def create_audit_log(
         db: Session,
@@ -18,38 +214,22 @@ class AuditService:
     ) -> AuditLog:
         """Create an audit log entry with blockchain-inspired hash"""
         
-        # Get the last audit log for this complaint
-        last_log = db.query(AuditLog).filter(
-            AuditLog.complaint_id == complaint_id
-        ).order_by(AuditLog.id.desc()).first()
-        
-        previous_hash = last_log.hash if last_log else ""
-        
-        # Prepare data for hashing
-        hash_data = {
-            "complaint_id": complaint_id,
-            "user_id": user_id,
-            "action_type": action_type,
-            "previous_state": previous_state,
-            "new_state": new_state,
-            "details": details
-        }
-        
-        # Compute hash
-        current_hash = compute_hash(hash_data, previous_hash)
+        # Lock the chain head; concurrent appends to this complaint wait here
+        head = AuditService._lock_heads(db, [complaint_id])[complaint_id]
         
         # Create audit log
-        audit_log = AuditLog(
+        audit_log = AuditService._build_audit_log(
+            head.last_hash,
             complaint_id=complaint_id,
             user_id=user_id,
             action_type=action_type,
             previous_state=previous_state,
             new_state=new_state,
-            details=json.dumps(details),
-            ip_address=ip_address,
-            hash=current_hash,
-            previous_hash=previous_hash
+            details=details,
+            ip_address=ip_address
         )
+        head.last_hash = audit_log.hash
+        head.length += 1
         
         db.add(audit_log)
         db.commit()
@@ -57,41 +237,39 @@ class AuditService:
         
         return audit_log
     
+    @staticmethod
+    def create_audit_logs_bulk(db: Session, entries: List[dict]) -> List[AuditLog]:
+        """
+        Append audit log entries for many complaints at once. Entries take the
+        keyword arguments of create_audit_log. The chain heads are locked in
+        one query and nothing is committed, so the caller's transaction
+        covers both the changes and their audit trail.
+        """
+        if not entries:
+            return []
+        
+        heads = AuditService._lock_heads(db, [entry["complaint_id"] for entry in entries])
+        
+        audit_logs = []
+        for entry in entries:
+            head = heads[entry["complaint_id"]]
+            audit_log = AuditService._build_audit_log(head.last_hash, **entry)
+            head.last_hash = audit_log.hash
+            head.length += 1
+            audit_logs.append(audit_log)
+        
+        db.add_all(audit_logs)
+        return audit_logs
+    
     @staticmethod
     def verify_audit_chain(db: Session, complaint_id: int) -> bool:
-        """Verify integrity of audit log chain for a complaint"""
-        logs = db.query(AuditLog).filter(
+        """Verify integrity of audit log chain for a complaint, archived entries included"""
+        archived = [archived_chain_row(entry) for entry in audit_archive.complaint_entries(db, complaint_id)]
+        rows = db.query(*AUDIT_CHAIN_COLUMNS).filter(
             AuditLog.complaint_id == complaint_id
         ).order_by(AuditLog.id).all()
         
-        if not logs:
-            return True
-        
-        previous_hash = ""
-        for log in logs:
-            # Reconstruct hash data
-            hash_data = {
-                "complaint_id": log.complaint_id,
-                "user_id": log.user_id,
-                "action_type": log.action_type,
-                "previous_state": log.previous_state,
-                "new_state": log.new_state,
-                "details": json.loads(log.details) if log.details else {}
-            }
-            
-            # Compute expected hash
-            expected_hash = compute_hash(hash_data, previous_hash)
-            
-            # Verify hash matches
-            if expected_hash != log.hash:
-                return False
-            
-            # Verify previous hash matches
-            if log.previous_hash != previous_hash:
-                return False
-            
-            previous_hash = log.hash
-        
-        return True
+        _, broken = verify_chain(archived + rows)
+        return broken is None
 
 audit_service = AuditService()
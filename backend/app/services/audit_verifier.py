@@ -0,0 +1,210 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import delete, insert, or_, tuple_, update
+from sqlalchemy.orm import Session
+from ..models.complaint import AuditLog, AuditCheckpoint
+from .audit_archive import AuditArchive, audit_archive
+from .audit_service import AUDIT_CHAIN_COLUMNS, archived_chain_row, verify_chain
+
+logger = logging.getLogger(__name__)
+
+BATCH_ROWS = 5000  # audit rows fetched per query
+CHUNK_ROWS = 2000  # audit rows handed to a worker at a time
+
+# (complaint_id, hash the first row must chain from, has a checkpoint row, rows)
+Unit = Tuple[int, str, bool, List[tuple]]
+
+
+def _verify_units(units: List[Unit]) -> List[tuple]:
+    """Process pool worker: verify whole complaint chains"""
+    results = []
+    for complaint_id, start_hash, has_checkpoint, rows in units:
+        last_good, broken = verify_chain(rows, start_hash)
+        if broken is None:
+            verified = len(rows)
+        else:
+            verified = rows.index(last_good) + 1 if last_good else 0
+        results.append((
+            complaint_id,
+            has_checkpoint,
+            last_good[0] if last_good else None,
+            last_good[7] if last_good else None,
+            verified,
+            broken
+        ))
+    return results
+
+
+@dataclass
+class VerificationReport:
+    complaints: int = 0
+    entries: int = 0
+    broken: List[Tuple[int, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.entries / self.elapsed if self.elapsed else 0.0
+
+
+class AuditVerifier:
+    """
+    Verifies the audit chains of every complaint.
+
+    Rows are read in (complaint_id, id) order with keyset pagination.
+    Each complaint's rows are grouped and the groups are spread over a
+    process pool. After a complaint's new entries verify, its last id and
+    hash are stored in audit_checkpoints, so the next run only reads
+    entries added since then. A broken complaint keeps its checkpoint at
+    the last good entry and is reported again on every run until fixed.
+
+    Live chains continue from the last archived entry of their complaint.
+    A full run also re-verifies every archive segment, block by block,
+    and checks that each block starts where the previous segment ended.
+    """
+
+    def __init__(self, session_factory, workers: int = 0, archive: AuditArchive = audit_archive):
+        self.session_factory = session_factory
+        self.workers = workers or os.cpu_count() or 1
+        self.archive = archive
+
+    def _archive_units(self, db: Session, report: VerificationReport) -> Iterator[Unit]:
+        tips = {}
+        for segment in self.archive.segments(db):
+            self.archive.verify_segment(segment)
+            for complaint_id, entry in self.archive.index(segment)["complaints"].items():
+                complaint_id = int(complaint_id)
+                rows = [archived_chain_row(row) for row in self.archive.read_block(segment, entry)]
+                if entry["start_hash"] != tips.get(complaint_id, ""):
+                    report.broken.append((complaint_id, f"archive {segment.path}: chain does not continue the previous segment"))
+                elif not rows or rows[-1][7] != entry["last_hash"]:
+                    report.broken.append((complaint_id, f"archive {segment.path}: index does not match the entries"))
+                else:
+                    yield complaint_id, entry["start_hash"], False, rows
+                tips[complaint_id] = entry["last_hash"]
+
+    def _units(self, db: Session, full: bool) -> Iterator[Unit]:
+        tips = self.archive.chain_tips(db)
+        query = db.query(*AUDIT_CHAIN_COLUMNS, AuditCheckpoint.last_hash).outerjoin(
+            AuditCheckpoint, AuditCheckpoint.complaint_id == AuditLog.complaint_id
+        )
+        if not full:
+            query = query.filter(or_(
+                AuditCheckpoint.last_log_id.is_(None),
+                AuditLog.id > AuditCheckpoint.last_log_id
+            ))
+        query = query.order_by(AuditLog.complaint_id, AuditLog.id)
+
+        current: Optional[Unit] = None
+        after = None
+        while True:
+            page = query
+            if after:
+                page = page.filter(tuple_(AuditLog.complaint_id, AuditLog.id) > tuple_(*after))
+            batch = page.limit(BATCH_ROWS).all()
+            if not batch:
+                break
+
+            for *row, checkpoint_hash in batch:
+                complaint_id = row[1]
+                if current is None or current[0] != complaint_id:
+                    if current:
+                        yield current
+                    has_checkpoint = checkpoint_hash is not None
+                    start_hash = checkpoint_hash if has_checkpoint and not full else tips.get(complaint_id, "")
+                    current = (complaint_id, start_hash, has_checkpoint, [])
+                current[3].append(tuple(row))
+            after = (batch[-1][1], batch[-1][0])
+
+        if current:
+            yield current
+
+    @staticmethod
+    def _chunks(units: Iterator[Unit]) -> Iterator[List[Unit]]:
+        chunk, size = [], 0
+        for unit in units:
+            chunk.append(unit)
+            size += len(unit[3])
+            if size >= CHUNK_ROWS:
+                yield chunk
+                chunk, size = [], 0
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _record_archive(results: List[tuple], report: VerificationReport):
+        for complaint_id, _, _, _, verified, broken in results:
+            report.entries += verified
+            if broken:
+                report.broken.append((complaint_id, f"archive: {broken}"))
+
+    def _verify(self, chunks: Iterator[List[Unit]], record):
+        """Verify chunks of units across the pool, passing each chunk's results to record"""
+        if self.workers == 1:
+            for chunk in chunks:
+                record(_verify_units(chunk))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            in_flight: deque = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(_verify_units, chunk))
+                if len(in_flight) >= self.workers * 2:
+                    record(in_flight.popleft().result())
+            while in_flight:
+                record(in_flight.popleft().result())
+
+    @staticmethod
+    def _record(db: Session, results: List[tuple], report: VerificationReport, full: bool):
+        inserts, updates, removals = [], [], []
+        for complaint_id, has_checkpoint, last_id, last_hash, verified, broken in results:
+            report.complaints += 1
+            report.entries += verified
+            if broken:
+                report.broken.append((complaint_id, broken))
+
+            if last_id is None:
+                # Nothing verified; a full run drops a checkpoint past the break
+                if full and has_checkpoint and broken:
+                    removals.append(complaint_id)
+                continue
+            values = {"complaint_id": complaint_id, "last_log_id": last_id, "last_hash": last_hash}
+            (updates if has_checkpoint else inserts).append(values)
+
+        if inserts:
+            db.execute(insert(AuditCheckpoint), inserts)
+        if updates:
+            db.execute(update(AuditCheckpoint), updates)
+        if removals:
+            db.execute(delete(AuditCheckpoint).where(AuditCheckpoint.complaint_id.in_(removals)))
+        db.commit()
+
+    def run(self, full: bool = False) -> VerificationReport:
+        """Verify new audit entries (all entries with full=True) and advance the checkpoints"""
+        report = VerificationReport()
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            if full:
+                self._verify(
+                    self._chunks(self._archive_units(db, report)),
+                    lambda results: self._record_archive(results, report)
+                )
+            self._verify(
+                self._chunks(self._units(db, full)),
+                lambda results: self._record(db, results, report, full)
+            )
+        finally:
+            db.close()
+
+        report.elapsed = time.perf_counter() - start
+        logger.info(
+            f"Verified {report.entries} audit entries of {report.complaints} complaints "
+            f"in {report.elapsed:.1f}s, {len(report.broken)} broken chains"
+        )
+        return report
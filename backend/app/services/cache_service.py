@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import redis
+from ..config import get_settings
+from ..utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REDIS_RETRY_SECONDS = 30
+
+
+class MemoryStore:
+    """In-process key-value store with per-key expiry"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._data: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def _purge(self, now: float):
+        if len(self._data) < self.max_entries:
+            return
+        for key in [k for k, (_, expires_at) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+        while len(self._data) >= self.max_entries:
+            # dicts keep insertion order; evict the oldest entries
+            del self._data[next(iter(self._data))]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key, time.monotonic())
+
+    def set(self, key: str, value: str, ttl: int):
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            self._data.pop(key, None)
+            self._data[key] = (value, now + ttl)
+
+    def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._purge(now)
+            self._data[key] = (value, now + ttl)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisStore:
+    def get(self, key: str) -> Optional[str]:
+        return get_redis().get(key)
+
+    def set(self, key: str, value: str, ttl: int):
+        get_redis().set(key, value, ex=ttl)
+
+    def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        return bool(get_redis().set(key, value, ex=ttl, nx=True))
+
+    def delete(self, key: str):
+        get_redis().delete(key)
+
+
+class CacheService:
+    """
+    Key-value store shared by all workers through Redis (CACHE_BACKEND=redis).
+    If Redis is unreachable it falls back to an in-process store and retries
+    Redis every REDIS_RETRY_SECONDS; CACHE_BACKEND=memory never uses Redis.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.memory = MemoryStore()
+        self.redis = RedisStore()
+        self._redis_down_until = 0.0
+
+    def _call(self, method: str, *args):
+        if self.backend == "redis" and time.monotonic() >= self._redis_down_until:
+            try:
+                return getattr(self.redis, method)(*args)
+            except redis.RedisError as e:
+                logger.warning(f"Redis unavailable, using in-process cache: {e}")
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        return getattr(self.memory, method)(*args)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._call("get", key)
+
+    def set(self, key: str, value: str, ttl: int):
+        self._call("set", key, value, ttl)
+
+    def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        return self._call("set_if_absent", key, value, ttl)
+
+    def delete(self, key: str):
+        self._call("delete", key)
+
+
+cache_service = CacheService(settings.CACHE_BACKEND)
@@ -0,0 +1,93 @@
+import threading
+from datetime import datetime
+from typing import Callable, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.complaint import Complaint, ComplaintIdSequence
+from ..utils.helpers import complaint_id_prefix, format_complaint_id
+
+settings = get_settings()
+
+
+class ComplaintIdAllocator:
+    """
+    Hands out monotonic per-month complaint IDs. Each process reserves a
+    block of sequence numbers with a single atomic UPDATE and serves IDs
+    from it in memory, so most allocations need no database round trip.
+    Blocks never overlap across workers; unused numbers are simply skipped.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], block_size: int):
+        self.session_factory = session_factory
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._period = None
+        self._next = 0
+        self._end = 0
+
+    def next_id(self) -> str:
+        now = datetime.now()
+        period = f"{now.year}-{now.month:02d}"
+
+        with self._lock:
+            if period != self._period or self._next >= self._end:
+                self._next, self._end = self._reserve_block(period)
+                self._period = period
+            sequence = self._next
+            self._next += 1
+
+        return format_complaint_id(period, sequence)
+
+    def _reserve_block(self, period: str) -> Tuple[int, int]:
+        """Atomically advance the period's counter by one block and return [start, end)"""
+        db = self.session_factory()
+        try:
+            for _ in range(3):
+                # The row lock taken by the UPDATE serializes concurrent reservations
+                updated = db.query(ComplaintIdSequence).filter(
+                    ComplaintIdSequence.period == period
+                ).update(
+                    {ComplaintIdSequence.next_value: ComplaintIdSequence.next_value + self.block_size},
+                    synchronize_session=False
+                )
+                if updated:
+                    end = db.query(ComplaintIdSequence.next_value).filter(
+                        ComplaintIdSequence.period == period
+                    ).scalar()
+                    db.commit()
+                    return end - self.block_size, end
+
+                # First reservation of the month; another worker may win the insert
+                db.add(ComplaintIdSequence(period=period, next_value=self._first_sequence(db, period)))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+
+            raise RuntimeError(f"Could not reserve complaint IDs for {period}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _first_sequence(db: Session, period: str) -> int:
+        """Start after any ID already issued this month (e.g. older random IDs)"""
+        prefix = complaint_id_prefix(period)
+        last_id = db.query(Complaint.complaint_id).filter(
+            Complaint.complaint_id.like(f"{prefix}%")
+        ).order_by(
+            func.length(Complaint.complaint_id).desc(),
+            Complaint.complaint_id.desc()
+        ).limit(1).scalar()
+
+        if last_id and last_id[len(prefix):].isdigit():
+            return int(last_id[len(prefix):]) + 1
+        return 1
+
+
+complaint_id_allocator = ComplaintIdAllocator(SessionLocal, settings.COMPLAINT_ID_BLOCK_SIZE)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from redis import asyncio as aioredis
+from ..config import get_settings
+from ..utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CHANNEL_PREFIX = "sgrs:events:"
+ADMIN_CHANNEL = "role:admin"
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def complaint_event(complaint, event_type: str, citizen_visible: bool = True, **data) -> Tuple[List[str], dict]:
+    """Build the channels and payload for an event about a complaint"""
+    channels = [ADMIN_CHANNEL]
+    if citizen_visible and complaint.citizen_id:
+        channels.append(user_channel(complaint.citizen_id))
+    if complaint.assigned_to:
+        channels.append(user_channel(complaint.assigned_to))
+
+    event = {
+        "type": event_type,
+        "complaint_id": complaint.id,
+        "complaint_ref": complaint.complaint_id,
+        "timestamp": datetime.utcnow().isoformat(),
+        **data
+    }
+    return channels, event
+
+
+class Subscription:
+    """A bounded per-connection event queue; the oldest events are dropped if a client falls behind"""
+
+    def __init__(self, bus: "EventBus", channels: List[str], max_queue: int = 100):
+        self.bus = bus
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def put_threadsafe(self, payload: str):
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload: str):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(payload)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """Next event payload, or None after `timeout` seconds of silence"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    Fan-out of complaint events to connected clients.
+
+    Connections subscribe to channels (user:<id>, role:admin) and receive
+    events through local queues. With EVENT_BUS_BACKEND=memory events are
+    delivered within this process only; with "redis" they are published to
+    Redis and each worker relays them from a single pattern subscription.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._listeners: Dict[str, List[Callable[[str], None]]] = {}
+        self._lock = threading.Lock()
+        self._listener_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, channels: List[str]) -> Subscription:
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def add_listener(self, channel: str, callback: Callable[[str], None]):
+        """Call callback(payload) for every event on a channel, e.g. to keep worker caches in sync"""
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(callback)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+    def _dispatch(self, channel: str, payload: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            listeners = list(self._listeners.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put_threadsafe(payload)
+        for callback in listeners:
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Event listener failed on {channel}: {e}")
+
+    def publish_many(self, events: Iterable[Tuple[Iterable[str], dict]]):
+        """
+        Publish (channels, event) pairs. Safe to call from request threads;
+        failures are logged and never raised into the caller.
+        """
+        messages = [
+            (channel, json.dumps(event, default=str))
+            for channels, event in events
+            for channel in channels
+        ]
+        if not messages:
+            return
+
+        if self.backend == "redis":
+            try:
+                pipeline = get_redis().pipeline(transaction=False)
+                for channel, payload in messages:
+                    pipeline.publish(CHANNEL_PREFIX + channel, payload)
+                pipeline.execute()
+            except Exception as e:
+                logger.error(f"Event publish failed: {e}")
+            return
+
+        for channel, payload in messages:
+            self._dispatch(channel, payload)
+
+    def publish(self, channels: Iterable[str], event: dict):
+        self.publish_many([(channels, event)])
+
+    async def start(self):
+        if self.backend == "redis" and self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._relay_from_redis())
+
+    async def stop(self):
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+
+    async def _relay_from_redis(self):
+        """Relay events published by any worker to this worker's subscribers"""
+        backoff = 1
+        while True:
+            client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                    backoff = 1
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        channel = message["channel"][len(CHANNEL_PREFIX):]
+                        self._dispatch(channel, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event relay error, reconnecting in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await client.aclose()
+
+
+event_bus = EventBus(settings.EVENT_BUS_BACKEND)
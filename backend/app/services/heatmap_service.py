@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import Date, and_, case, cast, func, literal_column, tuple_
+from sqlalchemy.orm import Session
+from ..models.complaint import Complaint, ComplaintCategory, ComplaintStatus, OPEN_STATUSES
+
+MAX_WEEKS = 52
+HOTSPOTS = 10
+
+
+class HeatmapService:
+    """
+    Ward x category (x week) complaint matrices for the analytics heatmap.
+
+    One grouped query returns, via GROUPING SETS, a row per (ward,
+    category, week) with that week's new complaints and a row per (ward,
+    category) with the totals, open backlog and median resolution time
+    over the whole window. The rows are scattered into numpy arrays by
+    their ward, category and week indices, so the cost after the query
+    does not grow with per-ward Python loops. Requires PostgreSQL
+    (date_trunc, percentile_cont), like the other resolution-time analytics.
+    """
+
+    @staticmethod
+    def window_start(weeks: int, today: Optional[date] = None) -> date:
+        """Monday of the first week in a window of `weeks` weeks ending this week"""
+        today = today or datetime.utcnow().date()
+        return today - timedelta(days=today.weekday(), weeks=weeks - 1)
+
+    @staticmethod
+    def _query(db: Session, start: date) -> List[tuple]:
+        in_window = Complaint.created_at >= start
+        # A literal unit so the select and GROUP BY render the same expression
+        week = cast(func.date_trunc(literal_column("'week'"), Complaint.created_at), Date)
+        resolution_seconds = case(
+            (and_(Complaint.resolved_at >= start, Complaint.status.in_([ComplaintStatus.RESOLVED, ComplaintStatus.CLOSED])),
+             func.extract("epoch", Complaint.resolved_at - Complaint.created_at)),
+            else_=None
+        )
+        return db.query(
+            func.grouping(week),
+            Complaint.ward,
+            Complaint.category,
+            week,
+            func.count(case((in_window, 1))),
+            func.count(case((Complaint.status.in_(OPEN_STATUSES), 1))),
+            func.percentile_cont(0.5).within_group(resolution_seconds)
+        ).filter(
+            # Open complaints older than the window still count towards the backlog
+            (Complaint.created_at >= start) | Complaint.status.in_(OPEN_STATUSES)
+        ).group_by(func.grouping_sets(
+            tuple_(Complaint.ward, Complaint.category, week),
+            tuple_(Complaint.ward, Complaint.category)
+        )).all()
+
+    @staticmethod
+    def pivot(rows: List[tuple], start: date, weeks: int) -> dict:
+        """
+        Build the heatmap from (grouping, ward, category, week, complaints,
+        open, median seconds) rows. grouping is 1 on the per-cell rows
+        (week rolled up) and 0 on the weekly rows.
+        """
+        categories = [c.value for c in ComplaintCategory]
+        category_index = {c: i for i, c in enumerate(ComplaintCategory)}
+        if not rows:
+            empty = np.zeros((0, len(categories)))
+            return HeatmapService._response([], categories, start, weeks, empty, empty, empty, np.zeros((0, len(categories), weeks)))
+
+        grouping, ward, category, week, complaints, backlog, median = map(list, zip(*rows))
+        wards, ward_idx = np.unique(np.array(ward), return_inverse=True)
+        cat_idx = np.array([category_index[c] for c in category])
+        cell = np.array(grouping) == 1
+        shape = (len(wards), len(categories))
+
+        totals = np.zeros(shape, dtype=np.int64)
+        open_backlog = np.zeros(shape, dtype=np.int64)
+        median_days = np.full(shape, np.nan)
+        totals[ward_idx[cell], cat_idx[cell]] = np.array(complaints, dtype=np.int64)[cell]
+        open_backlog[ward_idx[cell], cat_idx[cell]] = np.array(backlog, dtype=np.int64)[cell]
+        median_days[ward_idx[cell], cat_idx[cell]] = np.array(
+            [np.nan if m is None else float(m) for m in median], dtype=float
+        )[cell] / 86400
+
+        # Weekly rows for weeks before the window only carry old open complaints
+        weekly = np.zeros(shape + (weeks,), dtype=np.int64)
+        week_rows = np.flatnonzero(~cell)
+        if week_rows.size:
+            week_idx = (np.array([week[i].toordinal() for i in week_rows]) - start.toordinal()) // 7
+            keep = (week_idx >= 0) & (week_idx < weeks)
+            rows_kept = week_rows[keep]
+            weekly[ward_idx[rows_kept], cat_idx[rows_kept], week_idx[keep]] = np.array(complaints, dtype=np.int64)[rows_kept]
+
+        return HeatmapService._response(wards.tolist(), categories, start, weeks, totals, open_backlog, median_days, weekly)
+
+    @staticmethod
+    def _response(wards, categories, start, weeks, totals, open_backlog, median_days, weekly) -> dict:
+        # Cells with the largest open backlog, ties broken by new complaints
+        order = np.lexsort((-totals.ravel(), -open_backlog.ravel()))[:HOTSPOTS]
+        order = order[open_backlog.ravel()[order] > 0]
+        ward_of, category_of = np.unravel_index(order, totals.shape) if totals.size else ([], [])
+
+        median_rounded = np.round(median_days, 2)
+        return {
+            "wards": wards,
+            "categories": categories,
+            "weeks": [str(start + timedelta(weeks=i)) for i in range(weeks)],
+            "complaints": totals.tolist(),
+            "open_backlog": open_backlog.tolist(),
+            "median_resolution_days": np.where(np.isnan(median_rounded), None, median_rounded).tolist(),
+            "weekly_complaints": weekly.tolist(),
+            "ward_totals": dict(zip(wards, totals.sum(axis=1).tolist())),
+            "category_totals": dict(zip(categories, totals.sum(axis=0).tolist())),
+            "hotspots": [
+                {
+                    "ward": wards[w],
+                    "category": categories[c],
+                    "open_backlog": int(open_backlog[w, c]),
+                    "complaints": int(totals[w, c])
+                }
+                for w, c in zip(ward_of, category_of)
+            ]
+        }
+
+    def build(self, db: Session, weeks: int) -> dict:
+        start = self.window_start(weeks)
+        return self.pivot(self._query(db, start), start, weeks)
+
+
+heatmap_service = HeatmapService()
@@ -0,0 +1,66 @@
+import hashlib
+import json
+from typing import Optional
+from ..config import get_settings
+from .cache_service import cache_service
+
+settings = get_settings()
+
+MAX_KEY_LENGTH = 255
+RESERVE_ATTEMPTS = 5
+
+
+def request_fingerprint(body: str) -> str:
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Remembers the response to a request sent with an Idempotency-Key so
+    retries get the same response without repeating the work. Keys are
+    scoped per user and kept in the shared cache for IDEMPOTENCY_TTL_SECONDS.
+    """
+
+    @staticmethod
+    def _store_key(user_id: int, key: str) -> str:
+        return f"idempotency:{user_id}:{key}"
+
+    def begin(self, user_id: int, key: str, fingerprint: str) -> Optional[dict]:
+        """
+        Reserve a key for a new request. Returns None if this request holds
+        the reservation and should proceed, otherwise the existing record:
+        {"state": "pending"|"done", "fingerprint", and for completed
+        requests "status_code" and "body"}.
+        """
+        store_key = self._store_key(user_id, key)
+        pending = json.dumps({"state": "pending", "fingerprint": fingerprint})
+
+        # The pending marker expires on its own if the worker dies mid-request.
+        # A record can expire between the two calls; try again, and if the key
+        # keeps flapping report it as in progress so the request never runs unreserved.
+        for _ in range(RESERVE_ATTEMPTS):
+            if cache_service.set_if_absent(store_key, pending, settings.IDEMPOTENCY_PENDING_SECONDS):
+                return None
+            existing = cache_service.get(store_key)
+            if existing is not None:
+                return json.loads(existing)
+        return {"state": "pending", "fingerprint": fingerprint}
+
+    def complete(self, user_id: int, key: str, fingerprint: str, status_code: int, body):
+        cache_service.set(
+            self._store_key(user_id, key),
+            json.dumps({
+                "state": "done",
+                "fingerprint": fingerprint,
+                "status_code": status_code,
+                "body": body
+            }),
+            settings.IDEMPOTENCY_TTL_SECONDS
+        )
+
+    def release(self, user_id: int, key: str):
+        """Forget a key whose request failed, so a retry runs again"""
+        cache_service.delete(self._store_key(user_id, key))
+
+
+idempotency_service = IdempotencyService()
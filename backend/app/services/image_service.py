@@ -0,0 +1,176 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+from PIL import Image, ImageOps
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.complaint import Attachment, Complaint, ImageHashBand
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+THUMBNAIL_SIZES = [160, 480, 1024]
+VARIANTS = ["clean"] + [f"thumb_{size}" for size in THUMBNAIL_SIZES]
+
+# The 64-bit hash is indexed as 8 bands of 8 bits. Two hashes within
+# Hamming distance 7 must agree on at least one band (pigeonhole), so
+# a band lookup finds every near-duplicate up to that distance.
+PHASH_BANDS = 8
+PHASH_BAND_BITS = 64 // PHASH_BANDS
+MAX_DUPLICATE_DISTANCE = PHASH_BANDS - 1
+
+
+def difference_hash(img: Image.Image) -> int:
+    """64-bit dHash: compares adjacent pixels of a 9x8 grayscale thumbnail"""
+    small = img.convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hash_bands(value: int) -> List[int]:
+    mask = (1 << PHASH_BAND_BITS) - 1
+    return [(value >> (i * PHASH_BAND_BITS)) & mask for i in range(PHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def process_image(source_path: str, output_dir: str) -> dict:
+    """
+    Runs in a worker process: writes an EXIF-stripped copy and thumbnails
+    to output_dir and returns the image size and perceptual hash.
+    """
+    with Image.open(source_path) as original:
+        # Apply the orientation tag before the metadata is dropped
+        img = ImageOps.exif_transpose(original)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Re-encoding from pixels without passing exif/icc drops all metadata (GPS etc.)
+        img.save(os.path.join(output_dir, "clean.jpg"), "JPEG", quality=90, optimize=True)
+
+        for size in THUMBNAIL_SIZES:
+            thumb = img.copy()
+            thumb.thumbnail((size, size), Image.LANCZOS)
+            thumb.save(os.path.join(output_dir, f"thumb_{size}.jpg"), "JPEG", quality=80)
+
+        return {
+            "width": img.width,
+            "height": img.height,
+            "phash": f"{difference_hash(img):016x}"
+        }
+
+
+class ImageService:
+    def __init__(self, upload_dir: str, max_workers: int):
+        self.upload_dir = upload_dir
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def derived_dir(content_hash: str) -> str:
+        """Relative directory holding the derived images of a stored file"""
+        return os.path.join("derived", content_hash[:2], content_hash[2:4], content_hash)
+
+    def variant_path(self, content_hash: str, variant: str) -> str:
+        """Relative path of a derived image variant"""
+        return os.path.join(self.derived_dir(content_hash), f"{variant}.jpg")
+
+    def process_attachment(self, db: Session, attachment: Attachment, source_path: str):
+        """Generate derivatives and index the perceptual hash of an image attachment"""
+        # Deduplicated uploads share derivatives; reuse an earlier result if there is one
+        processed = db.query(Attachment).filter(
+            Attachment.content_hash == attachment.content_hash,
+            Attachment.phash.isnot(None)
+        ).first()
+
+        if processed:
+            result = {"width": processed.width, "height": processed.height, "phash": processed.phash}
+        else:
+            output_dir = os.path.join(self.upload_dir, self.derived_dir(attachment.content_hash))
+            future = self.executor.submit(process_image, source_path, output_dir)
+            result = future.result()
+
+        attachment.width = result["width"]
+        attachment.height = result["height"]
+        attachment.phash = result["phash"]
+        attachment.processed_at = datetime.utcnow()
+
+        ward = db.query(Complaint.ward).filter(Complaint.id == attachment.complaint_id).scalar()
+        db.query(ImageHashBand).filter(ImageHashBand.attachment_id == attachment.id).delete()
+        db.add_all([
+            ImageHashBand(
+                attachment_id=attachment.id,
+                complaint_id=attachment.complaint_id,
+                ward=ward,
+                band=band,
+                value=value
+            )
+            for band, value in enumerate(hash_bands(int(result["phash"], 16)))
+        ])
+        db.commit()
+
+    @staticmethod
+    def find_similar(
+        db: Session,
+        attachment: Attachment,
+        max_distance: int = 6
+    ) -> List[Tuple[Attachment, int]]:
+        """Find visually near-duplicate images from other complaints in the same ward"""
+        if not attachment.phash:
+            return []
+
+        target = int(attachment.phash, 16)
+        ward = db.query(Complaint.ward).filter(Complaint.id == attachment.complaint_id).scalar()
+
+        band_match = or_(*[
+            and_(ImageHashBand.band == band, ImageHashBand.value == value)
+            for band, value in enumerate(hash_bands(target))
+        ])
+        candidates = db.query(Attachment).join(
+            ImageHashBand, ImageHashBand.attachment_id == Attachment.id
+        ).filter(
+            ImageHashBand.ward == ward,
+            band_match,
+            Attachment.complaint_id != attachment.complaint_id
+        ).distinct().all()
+
+        matches = []
+        for candidate in candidates:
+            distance = hamming_distance(target, int(candidate.phash, 16))
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+
+        matches.sort(key=lambda match: (match[1], match[0].id))
+        return matches
+
+
+image_service = ImageService(settings.UPLOAD_DIR, settings.IMAGE_WORKERS)
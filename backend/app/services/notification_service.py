@@ -1,7 +1,7 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List
+from typing import List, Tuple
 from ..config import get_settings
 import logging
 
@@ -34,6 +34,36 @@ class NotificationService:
             logger.error(f"Email sending failed: {e}")
             return False
     
+    @staticmethod
+    def send_bulk_emails(messages: List[Tuple[str, str, str]]):
+        """Send (to_email, subject, html_body) messages over a single SMTP connection"""
+        if not messages:
+            return 0
+        
+        sent = 0
+        try:
+            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+                server.starttls()
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+                
+                for to_email, subject, body in messages:
+                    message = MIMEMultipart("alternative")
+                    message["Subject"] = subject
+                    message["From"] = settings.SMTP_FROM
+                    message["To"] = to_email
+                    message.attach(MIMEText(body, "html"))
+                    
+                    try:
+                        server.send_message(message)
+                        sent += 1
+                    except smtplib.SMTPRecipientsRefused as e:
+                        logger.error(f"Email to {to_email} refused: {e}")
+            
+            logger.info(f"Bulk email: sent {sent} of {len(messages)}")
+        except Exception as e:
+            logger.error(f"Bulk email sending failed after {sent} of {len(messages)}: {e}")
+        return sent
+    
     @staticmethod
     def send_complaint_confirmation(to_email: str, complaint_id: str, title: str):
         """Send complaint submission confirmation"""
@@ -52,8 +82,8 @@ class NotificationService:
         return NotificationService.send_email(to_email, subject, body)
     
     @staticmethod
-    def send_status_update(to_email: str, complaint_id: str, old_status: str, new_status: str):
-        """Send complaint status update notification"""
+    def status_update_email(complaint_id: str, old_status: str, new_status: str) -> Tuple[str, str]:
+        """Build subject and body of a status update email"""
         subject = f"Complaint Update - {complaint_id}"
         body = f"""
         <html>
@@ -65,8 +95,22 @@ class NotificationService:
             </body>
         </html>
         """
+        return subject, body
+    
+    @staticmethod
+    def send_status_update(to_email: str, complaint_id: str, old_status: str, new_status: str):
+        """Send complaint status update notification"""
+        subject, body = NotificationService.status_update_email(complaint_id, old_status, new_status)
         return NotificationService.send_email(to_email, subject, body)
     
+    @staticmethod
+    def send_status_updates_bulk(updates: List[Tuple[str, str, str, str]]):
+        """Send (to_email, complaint_id, old_status, new_status) updates in one SMTP session"""
+        return NotificationService.send_bulk_emails([
+            (to_email, *NotificationService.status_update_email(complaint_id, old_status, new_status))
+            for to_email, complaint_id, old_status, new_status in updates
+        ])
+    
     @staticmethod
     def send_assignment_notification(to_email: str, complaint_id: str, title: str):
         """Send complaint assignment notification to officer"""
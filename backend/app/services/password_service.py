@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from ..config import get_settings
+from ..utils.security import verify_password, get_password_hash, password_hash_rounds
+from .rate_limit_service import ServiceOverloaded
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL,
+    so the workers hash in parallel). Async callers wait without holding an
+    API thread, and once max_pending jobs are queued new ones are refused
+    with ServiceOverloaded rather than letting a login storm build an
+    unbounded backlog.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.rounds = rounds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise ServiceOverloaded(retry_after=1)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password, self.rounds)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch with at most `workers` jobs queued at a time, so a bulk
+        import never takes the pending slots that logins rely on.
+        """
+        window = asyncio.Semaphore(self.workers)
+
+        async def hash_one(password: str) -> str:
+            async with window:
+                return await self.hash(password)
+
+        return await asyncio.gather(*(hash_one(p) for p in passwords))
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(verify_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if a hash was made with a different cost factor than BCRYPT_ROUNDS"""
+        return password_hash_rounds(hashed) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+    settings.BCRYPT_ROUNDS
+)
@@ -0,0 +1,111 @@
+import json
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from ..config import get_settings
+from ..models.user import User
+from .event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PRINCIPAL_CHANNEL = "system:principals"
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of authenticated users keyed by token subject (email),
+    so most requests skip the users query. Entries expire after
+    PRINCIPAL_CACHE_TTL_SECONDS and are dropped as soon as a change to the
+    user commits, in this worker directly and in the others through the
+    event bus. Each hit returns its own detached User instance.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[dict, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(subject, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            values = entry[0]
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User):
+        if self.ttl <= 0:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            self._entries[user.email] = (values, time.monotonic() + self.ttl)
+
+    def invalidate(self, subjects: Iterable[str], broadcast: bool = True):
+        """Forget cached users; broadcast=True also tells the other workers"""
+        subjects = list(subjects)
+        with self._lock:
+            for subject in subjects:
+                if self._entries.pop(subject, None) is not None:
+                    self.invalidations += 1
+        if broadcast and subjects:
+            event_bus.publish([PRINCIPAL_CHANNEL], {"type": "principal_invalidated", "subjects": subjects})
+
+    def _on_event(self, payload: str):
+        self.invalidate(json.loads(payload).get("subjects", []), broadcast=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "ttl_seconds": self.ttl,
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations
+        }
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS)
+event_bus.add_listener(PRINCIPAL_CHANNEL, principal_cache._on_event)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session, flush_context):
+    """Record users whose role, verification or profile changed; dropped on commit"""
+    subjects = session.info.setdefault("changed_principals", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            subjects.add(obj.email)
+            subjects.update(inspect(obj).attrs.email.history.deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session):
+    subjects = session.info.pop("changed_principals", None)
+    if subjects:
+        principal_cache.invalidate(subjects)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_changed_principals(session, transaction):
+    # Only the outermost transaction; the flushed user changes survive a savepoint rollback
+    if transaction.parent is not None:
+        return
+    session.info.pop("changed_principals", None)
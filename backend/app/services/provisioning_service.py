@@ -0,0 +1,178 @@
+import csv
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.user import User, UserRole
+from ..schemas.user import UserCreate
+from ..utils.security import get_password_hash
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MAX_PROVISION_ROWS = 5000
+CSV_COLUMNS = ["email", "full_name", "password", "role", "phone", "ward", "department", "address"]
+EMAIL_QUERY_CHUNK = 1000
+
+
+class ProvisioningError(Exception):
+    pass
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+    )
+
+
+class ProvisioningService:
+    """
+    Creates many accounts from a CSV in one pass: rows are validated like
+    /register, emails are checked against the database in bulk, passwords
+    are hashed and users are inserted in batches. Every row gets its own
+    result; a bad row never blocks the others.
+
+    provision() hashes on a process pool of its own and is meant for the
+    CLI. Web workers call prepare() and create() around password_hasher,
+    so they never fork and stay within its pending-job limit.
+    """
+
+    def __init__(self, hash_processes: int, batch_size: int):
+        self.hash_processes = hash_processes or os.cpu_count() or 1
+        self.batch_size = batch_size
+
+    @staticmethod
+    def parse_csv(content: bytes) -> List[Dict[str, str]]:
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ProvisioningError("CSV must be UTF-8 encoded")
+
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or not {"email", "full_name", "password"} <= set(reader.fieldnames):
+            raise ProvisioningError("CSV needs at least the columns email, full_name and password")
+        unknown = set(reader.fieldnames) - set(CSV_COLUMNS)
+        if unknown:
+            raise ProvisioningError(f"Unknown CSV columns: {', '.join(sorted(unknown))}")
+
+        rows = list(reader)
+        if len(rows) > MAX_PROVISION_ROWS:
+            raise ProvisioningError(f"At most {MAX_PROVISION_ROWS} rows per file")
+        return rows
+
+    def _hash_passwords(self, passwords: List[str]) -> List[str]:
+        if len(passwords) < 2 or self.hash_processes == 1:
+            return [get_password_hash(p) for p in passwords]
+        chunksize = max(1, len(passwords) // (self.hash_processes * 4))
+        with ProcessPoolExecutor(max_workers=self.hash_processes) as pool:
+            return list(pool.map(get_password_hash, passwords, chunksize=chunksize))
+
+    @staticmethod
+    def _existing_emails(db: Session, emails: List[str]) -> set:
+        existing = set()
+        for start in range(0, len(emails), EMAIL_QUERY_CHUNK):
+            chunk = emails[start:start + EMAIL_QUERY_CHUNK]
+            existing.update(e for (e,) in db.query(User.email).filter(User.email.in_(chunk)).all())
+        return existing
+
+    def _insert_batch(self, db: Session, batch: List[tuple], results: Dict[int, dict]):
+        """Insert (row number, User) pairs; on a conflict retry row by row to find the culprit"""
+        try:
+            db.add_all([user for _, user in batch])
+            db.flush()
+            user_ids = [user.id for _, user in batch]
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            if len(batch) == 1:
+                row, user = batch[0]
+                results[row].update(success=False, detail="Email already registered")
+                return
+            for item in batch:
+                self._insert_batch(db, [item], results)
+            return
+
+        for (row, _), user_id in zip(batch, user_ids):
+            results[row].update(success=True, user_id=user_id)
+
+    def prepare(self, db: Session, rows: List[Dict[str, str]], default_role: UserRole = UserRole.OFFICER) -> Tuple[Dict[int, dict], Dict[int, UserCreate]]:
+        """
+        Validate CSV rows (dicts keyed by column) and drop emails already
+        registered. Returns the per-row results so far and the rows left to
+        create, both keyed by row number; row numbers count the header as
+        row 1, matching spreadsheet lines.
+        """
+        results: Dict[int, dict] = {}
+        valid: Dict[int, UserCreate] = {}
+        seen = set()
+
+        for row_number, row in enumerate(rows, start=2):
+            data = {k: v.strip() for k, v in row.items() if k and v is not None and v.strip()}
+            data.setdefault("role", default_role.value)
+            results[row_number] = {"row": row_number, "email": data.get("email"), "success": False}
+            try:
+                user = UserCreate(**data)
+            except ValidationError as e:
+                results[row_number]["detail"] = _validation_message(e)
+                continue
+
+            if user.email in seen:
+                results[row_number]["detail"] = "Duplicate email in file"
+                continue
+            seen.add(user.email)
+            valid[row_number] = user
+
+        existing = self._existing_emails(db, [u.email for u in valid.values()])
+        for row_number in [r for r, u in valid.items() if u.email in existing]:
+            results[row_number]["detail"] = "Email already registered"
+            del valid[row_number]
+        return results, valid
+
+    @staticmethod
+    def passwords(valid: Dict[int, UserCreate]) -> List[str]:
+        # Passwords are truncated to bcrypt's 72-byte limit like /register does
+        return [u.password[:72] for u in valid.values()]
+
+    def create(self, db: Session, results: Dict[int, dict], valid: Dict[int, UserCreate], hashes: List[str]) -> dict:
+        """Insert the prepared users with their password hashes (in the order of passwords())"""
+        pending = []
+        for (row_number, user), password_hash in zip(valid.items(), hashes):
+            pending.append((row_number, User(
+                email=user.email,
+                password_hash=password_hash,
+                full_name=user.full_name,
+                phone=user.phone,
+                ward=user.ward,
+                department=user.department,
+                address=user.address,
+                role=user.role,
+                is_verified=True
+            )))
+
+        for start in range(0, len(pending), self.batch_size):
+            self._insert_batch(db, pending[start:start + self.batch_size], results)
+
+        ordered = [results[r] for r in sorted(results)]
+        created = sum(1 for r in ordered if r["success"])
+        logger.info(f"Provisioned {created} of {len(ordered)} users")
+        return {"created": created, "failed": len(ordered) - created, "results": ordered}
+
+    def provision(self, db: Session, rows: List[Dict[str, str]], default_role: UserRole = UserRole.OFFICER) -> dict:
+        """
+        Create users from CSV rows in one go, hashing passwords on a
+        process pool started for this run. For offline use such as
+        provision_users.py; the API hashes through password_hasher instead.
+        """
+        results, valid = self.prepare(db, rows, default_role)
+        return self.create(db, results, valid, self._hash_passwords(self.passwords(valid)))
+
+
+provisioning_service = ProvisioningService(
+    settings.PROVISIONING_HASH_PROCESSES,
+    settings.PROVISIONING_BATCH_SIZE
+)
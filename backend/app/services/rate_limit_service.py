@@ -0,0 +1,219 @@
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+import redis
+from ..config import get_settings
+from ..utils.redis_client import get_redis
+from .cache_service import REDIS_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+MAX_MEMORY_BUCKETS = 100000
+
+# route -> {role | "*" | "ip": "<count>/<period>"}; RATE_LIMITS in settings overrides entries
+DEFAULT_RATE_LIMITS = {
+    "complaints:create": {
+        "citizen": "5/minute",
+        "ngo": "20/minute",
+        "officer": "30/minute",
+        "admin": "60/minute",
+        "ip": "30/minute"
+    },
+    "complaints:upload": {"*": "30/minute", "ip": "60/minute"},
+    "auth:login": {"ip": "20/minute"},
+    "auth:refresh": {"ip": "60/minute"},
+    "auth:register": {"ip": "10/minute"},
+}
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+def parse_limit(spec: str) -> Tuple[float, int]:
+    """'10/minute' -> (tokens per second, bucket capacity)"""
+    count, _, period = spec.partition("/")
+    capacity = int(count)
+    return capacity / PERIODS[period.strip()], capacity
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
+
+class ServiceOverloaded(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
+
+class RateLimitService:
+    """
+    Token-bucket rate limits per route, keyed by user (limit chosen by role)
+    and by client IP. Buckets live in Redis so limits hold across workers,
+    or in process memory with CACHE_BACKEND=memory or while Redis is down.
+    """
+
+    def __init__(self, backend: str, overrides: Dict[str, Dict[str, str]]):
+        self.backend = backend
+        self.limits = {route: dict(limits) for route, limits in DEFAULT_RATE_LIMITS.items()}
+        for route, limits in overrides.items():
+            self.limits.setdefault(route, {}).update(limits)
+
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}  # key -> (tokens, updated, full_at)
+        self._lock = threading.Lock()
+        self._script = None
+        self._redis_down_until = 0.0
+        self.allowed = Counter()
+        self.limited = Counter()
+
+    def _take_memory(self, key: str, rate: float, capacity: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if len(self._buckets) > MAX_MEMORY_BUCKETS:
+                # Buckets that have refilled carry no state worth keeping
+                self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _take(self, key: str, rate: float, capacity: int) -> Tuple[bool, float]:
+        if self.backend == "redis" and time.monotonic() >= self._redis_down_until:
+            try:
+                if self._script is None:
+                    self._script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+                allowed, retry_after = self._script(keys=[key], args=[rate, capacity, time.time()])
+                return bool(int(allowed)), float(retry_after)
+            except redis.RedisError as e:
+                logger.warning(f"Redis unavailable, using in-process rate limits: {e}")
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        return self._take_memory(key, rate, capacity)
+
+    def check(self, route: str, ip_address: Optional[str], role: Optional[str] = None, user_id: Optional[int] = None):
+        """Consume a token from the user and IP buckets; raises RateLimitExceeded"""
+        limits = self.limits.get(route, {})
+        checks = []
+        if user_id is not None:
+            spec = limits.get(role) or limits.get("*")
+            if spec:
+                checks.append((f"ratelimit:{route}:user:{user_id}", spec))
+        if ip_address and limits.get("ip"):
+            checks.append((f"ratelimit:{route}:ip:{ip_address}", limits["ip"]))
+
+        for key, spec in checks:
+            allowed, retry_after = self._take(key, *parse_limit(spec))
+            if not allowed:
+                self.limited[route] += 1
+                raise RateLimitExceeded(max(1, math.ceil(retry_after)))
+        self.allowed[route] += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "limits": self.limits,
+            "allowed": dict(self.allowed),
+            "limited": dict(self.limited)
+        }
+
+
+class AdmissionGate:
+    """
+    Caps concurrent model-inference work in this process. Up to max_queue
+    callers wait for a slot for at most queue_timeout seconds; beyond that
+    requests are shed with ServiceOverloaded instead of piling onto the CPU.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self._avg_seconds = 1.0  # moving average of time inside the gate
+
+    def _retry_after(self) -> int:
+        backlog = (self.waiting + self.active) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(backlog * self._avg_seconds))
+
+    @contextmanager
+    def admit(self):
+        with self._cond:
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.shed += 1
+                    raise ServiceOverloaded(self._retry_after())
+
+                self.waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed += 1
+                            raise ServiceOverloaded(self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+            self.admitted += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self.active -= 1
+                self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * elapsed
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "avg_service_ms": round(self._avg_seconds * 1000, 1)
+            }
+
+
+rate_limit_service = RateLimitService(settings.CACHE_BACKEND, settings.RATE_LIMITS)
+inference_gate = AdmissionGate(
+    settings.INFERENCE_MAX_CONCURRENT,
+    settings.INFERENCE_MAX_QUEUE,
+    settings.INFERENCE_QUEUE_TIMEOUT_SECONDS
+)
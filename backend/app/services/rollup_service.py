@@ -0,0 +1,162 @@
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from ..models.complaint import (
+    Complaint, ComplaintRollup, ComplaintCategory, ComplaintStatus, ComplaintPriority
+)
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH = 10000  # complaints streamed per fetch during a backfill
+
+# Complaint columns a rollup row depends on, in contribution() argument order
+ROLLUP_ATTRS = ("created_at", "ward", "category", "status", "priority", "resolved_at", "sentiment_score")
+METRICS = ("complaints", "resolved", "resolution_seconds", "sentiment_sum", "sentiment_count")
+DIMENSIONS = ("day", "ward", "category", "status", "priority")
+
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+RollupKey = Tuple[date, str, ComplaintCategory, ComplaintStatus, ComplaintPriority]
+
+
+def _as_utc(value: Optional[datetime]) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def contribution(created_at, ward, category, status, priority, resolved_at, sentiment_score) -> Tuple[RollupKey, tuple]:
+    """The rollup row a complaint counts in, and what it adds to each metric"""
+    created_at = _as_utc(created_at)
+    key = (
+        created_at.date(),
+        ward,
+        category,
+        status or ComplaintStatus.SUBMITTED,
+        priority or ComplaintPriority.MEDIUM
+    )
+    resolution_seconds = (_as_utc(resolved_at) - created_at).total_seconds() if resolved_at else 0.0
+    return key, (
+        1,
+        1 if resolved_at else 0,
+        resolution_seconds,
+        sentiment_score or 0.0,
+        0 if sentiment_score is None else 1
+    )
+
+
+def add_contribution(deltas: Dict[RollupKey, List[float]], values: tuple, sign: int):
+    key, metrics = contribution(*values)
+    row = deltas.setdefault(key, [0, 0, 0.0, 0.0, 0])
+    for i, metric in enumerate(metrics):
+        row[i] += sign * metric
+
+
+class RollupService:
+    """
+    Maintains complaint_rollups. Every flush that creates, changes or
+    deletes complaints turns into signed per-row deltas (minus the old
+    contribution, plus the new one) that are upserted in the same
+    transaction, so the rollups commit or roll back with the complaints.
+    backfill() rebuilds the table from scratch.
+    """
+
+    @staticmethod
+    def apply(connection: Connection, deltas: Dict[RollupKey, List[float]]):
+        """Add metric deltas to their rollup rows, creating missing rows"""
+        rows = [
+            {**dict(zip(DIMENSIONS, key)), **dict(zip(METRICS, metrics))}
+            for key, metrics in deltas.items() if any(metrics)
+        ]
+        if not rows:
+            return
+
+        # A fixed row order keeps concurrent transactions from deadlocking
+        rows.sort(key=lambda row: (row["day"], row["ward"], row["category"].value, row["status"].value, row["priority"].value))
+
+        table = ComplaintRollup.__table__
+        statement = _UPSERTS[connection.dialect.name](table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(DIMENSIONS),
+            set_={metric: table.c[metric] + statement.excluded[metric] for metric in METRICS}
+        )
+        connection.execute(statement, rows)
+
+    def backfill(self, db: Session) -> int:
+        """Recompute every rollup row from the complaints table; returns the row count"""
+        if db.bind.dialect.name == "postgresql":
+            # Hold off complaint writes so none land between the scan and the commit
+            db.execute(text("LOCK TABLE complaints IN SHARE MODE"))
+
+        deltas: Dict[RollupKey, List[float]] = {}
+        columns = [getattr(Complaint, attr) for attr in ROLLUP_ATTRS]
+        for row in db.query(*columns).yield_per(BACKFILL_BATCH):
+            add_contribution(deltas, tuple(row), 1)
+
+        db.query(ComplaintRollup).delete(synchronize_session=False)
+        self.apply(db.connection(), deltas)
+        db.commit()
+
+        logger.info(f"Rebuilt {len(deltas)} complaint rollup rows")
+        return len(deltas)
+
+
+rollup_service = RollupService()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_rollup_changes(session, flush_context, instances):
+    """Work out rollup deltas for changed and deleted complaints before their rows change"""
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Complaint) and any(inspect(obj).attrs[attr].history.has_changes() for attr in ROLLUP_ATTRS)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Complaint)]
+
+    deltas: Dict[RollupKey, List[float]] = {}
+    session.info["rollup_deltas"] = deltas
+    if not changed and not deleted:
+        return
+
+    # Stored values, read on the flush's connection; attribute history misses unloaded columns.
+    # The rows stay locked until commit so a concurrent update of the same complaint cannot
+    # subtract the same old contribution a second time; id order keeps the locks deadlock-free.
+    ids = sorted(obj.id for obj in changed + deleted)
+    columns = [getattr(Complaint, attr) for attr in ROLLUP_ATTRS]
+    stored = {
+        row[0]: tuple(row[1:])
+        for row in session.connection().execute(
+            select(Complaint.id, *columns).where(Complaint.id.in_(ids)).order_by(Complaint.id).with_for_update()
+        )
+    }
+
+    for obj in changed:
+        old = stored.get(obj.id)
+        if old is None:
+            continue
+        state = inspect(obj)
+        new = tuple(
+            state.attrs[attr].history.added[0] if state.attrs[attr].history.added else value
+            for attr, value in zip(ROLLUP_ATTRS, old)
+        )
+        add_contribution(deltas, old, -1)
+        add_contribution(deltas, new, 1)
+
+    for obj in deleted:
+        if obj.id in stored:
+            add_contribution(deltas, stored[obj.id], -1)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollup_changes(session, flush_context):
+    deltas = session.info.pop("rollup_deltas", {})
+    for obj in session.new:
+        if isinstance(obj, Complaint):
+            add_contribution(deltas, tuple(getattr(obj, attr) for attr in ROLLUP_ATTRS), 1)
+
+    if deltas:
+        rollup_service.apply(session.connection(), deltas)
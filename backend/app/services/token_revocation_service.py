@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.user import RevokedToken
+from .event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REVOCATION_CHANNEL = "system:revocations"
+FAMILY = "family"
+REFRESH = "refresh"
+
+
+class TokenRevocationService:
+    """
+    Revoked token families, checked on every authenticated request without
+    touching the database.
+
+    Every login starts a token family shared by its access and refresh
+    tokens. Revoking a family stops its refresh token in the database and
+    its access tokens through an in-memory map. Access tokens live for
+    ACCESS_TOKEN_EXPIRE_MINUTES and a revoked family can never mint new
+    ones, so a family only has to stay in memory that long; the map holds
+    just the families revoked within one access-token lifetime.
+
+    Revocations reach other workers over the event bus. Each worker also
+    re-reads recent revocations every REVOCATION_RESYNC_SECONDS, so a
+    missed message cannot keep a revoked token alive.
+    """
+
+    def __init__(self, resync_seconds: int):
+        self.resync_seconds = resync_seconds
+        self._families: Dict[str, datetime] = {}  # family -> when its access tokens have all expired
+        self._lock = threading.Lock()
+        self._synced_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _access_lifetime() -> timedelta:
+        return timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    def is_revoked(self, family: Optional[str]) -> bool:
+        if not family:
+            return False
+        with self._lock:
+            until = self._families.get(family)
+        return until is not None and until > datetime.utcnow()
+
+    def _remember(self, families: Iterable[str], until: datetime):
+        with self._lock:
+            for family in families:
+                if self._families.get(family, datetime.min) < until:
+                    self._families[family] = until
+
+    def _on_event(self, payload: str):
+        event = json.loads(payload)
+        self._remember(event["families"], datetime.fromisoformat(event["until"]))
+
+    def revoke_family(self, db: Session, family: str, user_id: Optional[int], reason: str):
+        """Revoke every token of a family, here and in the other workers. Commits."""
+        now = datetime.utcnow()
+        existing = db.query(RevokedToken).filter(RevokedToken.token_id == family).first()
+        if existing is None:
+            db.add(RevokedToken(
+                token_id=family,
+                kind=FAMILY,
+                user_id=user_id,
+                reason=reason,
+                revoked_at=now,
+                expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # revoked concurrently
+
+        until = now + self._access_lifetime()
+        self._remember([family], until)
+        event_bus.publish([REVOCATION_CHANNEL], {
+            "type": "families_revoked",
+            "families": [family],
+            "until": until.isoformat()
+        })
+
+    def is_family_revoked_in_db(self, db: Session, family: str) -> bool:
+        """Authoritative check used when exchanging refresh tokens"""
+        return db.query(RevokedToken.id).filter(
+            RevokedToken.token_id == family,
+            RevokedToken.kind == FAMILY
+        ).first() is not None
+
+    def spend_refresh_token(self, db: Session, jti: str, user_id: int, expires_at: datetime):
+        """
+        Record a refresh token as used. Raises IntegrityError if it was already
+        spent, which means the token was replayed. Does not commit.
+        """
+        db.add(RevokedToken(
+            token_id=jti,
+            kind=REFRESH,
+            user_id=user_id,
+            reason="rotated",
+            revoked_at=datetime.utcnow(),
+            expires_at=expires_at
+        ))
+        db.flush()
+
+    def sync(self, db: Session):
+        """Reload families revoked within one access-token lifetime and purge expired rows"""
+        now = datetime.utcnow()
+        recent = db.query(RevokedToken.token_id, RevokedToken.revoked_at).filter(
+            RevokedToken.kind == FAMILY,
+            RevokedToken.revoked_at > now - self._access_lifetime()
+        ).all()
+        for family, revoked_at in recent:
+            self._remember([family], revoked_at + self._access_lifetime())
+
+        with self._lock:
+            self._families = {f: until for f, until in self._families.items() if until > now}
+
+        purged = db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        self._synced_at = now
+        if purged:
+            logger.info(f"Purged {purged} expired token revocations")
+
+    def _sync_once(self):
+        db = SessionLocal()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+
+    async def _sync_forever(self):
+        while True:
+            try:
+                await run_in_threadpool(self._sync_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(self.resync_seconds)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_forever())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"revoked_families_in_memory": len(self._families), "synced_at": self._synced_at}
+
+
+token_revocation_service = TokenRevocationService(settings.REVOCATION_RESYNC_SECONDS)
+event_bus.add_listener(REVOCATION_CHANNEL, token_revocation_service._on_event)
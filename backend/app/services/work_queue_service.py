@@ -0,0 +1,110 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session
+from ..models.complaint import Complaint, ComplaintPriority, ComplaintStatus, OPEN_STATUSES
+from ..models.user import User, UserRole
+from .audit_service import audit_service
+
+# Urgency = priority weight + age in hours + weighted negative sentiment (+ escalation bonus)
+PRIORITY_WEIGHTS = {
+    ComplaintPriority.CRITICAL: 100,
+    ComplaintPriority.HIGH: 60,
+    ComplaintPriority.MEDIUM: 30,
+    ComplaintPriority.LOW: 10
+}
+AGE_WEIGHT_PER_HOUR = 1.0
+SENTIMENT_WEIGHT = 20.0
+ESCALATION_BONUS = 50
+
+MAX_CLAIM = 50
+
+
+def urgency_score():
+    """SQL expression for a complaint's urgency, computed by the database"""
+    priority_weight = case(
+        *[(Complaint.priority == priority, weight) for priority, weight in PRIORITY_WEIGHTS.items()],
+        else_=PRIORITY_WEIGHTS[ComplaintPriority.MEDIUM]
+    )
+    age_hours = func.extract("epoch", func.now() - Complaint.created_at) / 3600
+    escalation = case((Complaint.status == ComplaintStatus.ESCALATED, ESCALATION_BONUS), else_=0)
+
+    return (
+        priority_weight
+        + age_hours * AGE_WEIGHT_PER_HOUR
+        - func.coalesce(Complaint.sentiment_score, 0) * SENTIMENT_WEIGHT
+        + escalation
+    ).label("urgency_score")
+
+
+class WorkQueueService:
+    @staticmethod
+    def _unassigned_filter(officer: User):
+        """Unassigned open complaints an officer may pick up (their own ward if they have one)"""
+        conditions = [Complaint.assigned_to.is_(None), Complaint.status.in_(OPEN_STATUSES)]
+        if officer.role == UserRole.OFFICER and officer.ward:
+            conditions.append(Complaint.ward == officer.ward)
+        return conditions
+
+    @staticmethod
+    def get_queue(
+        db: Session,
+        officer: User,
+        limit: int = 50,
+        include_unassigned: bool = True
+    ) -> List[Tuple[Complaint, float]]:
+        """Open complaints for an officer, most urgent first"""
+        query = db.query(Complaint, urgency_score()).filter(Complaint.status.in_(OPEN_STATUSES))
+
+        if officer.role == UserRole.OFFICER:
+            visible = Complaint.assigned_to == officer.id
+            if include_unassigned:
+                visible = or_(visible, and_(*WorkQueueService._unassigned_filter(officer)))
+            query = query.filter(visible)
+
+        return query.order_by(urgency_score().desc(), Complaint.id).limit(limit).all()
+
+    @staticmethod
+    def claim_next(
+        db: Session,
+        officer: User,
+        count: int,
+        ip_address: Optional[str]
+    ) -> List[Tuple[Complaint, Optional[str], Optional[int]]]:
+        """
+        Atomically assign the `count` most urgent unassigned complaints to
+        an officer. Rows locked by another claim are skipped rather than
+        waited on, so concurrent claims never block or hand out the same
+        complaint twice. Returns each claimed complaint with its previous
+        status and assignee.
+        """
+        complaints = db.query(Complaint).filter(
+            *WorkQueueService._unassigned_filter(officer)
+        ).order_by(
+            urgency_score().desc(), Complaint.id
+        ).limit(count).with_for_update(skip_locked=True, of=Complaint).all()
+
+        audit_entries = []
+        claimed = []
+        for complaint in complaints:
+            previous_status = complaint.status.value if complaint.status else None
+            claimed.append((complaint, previous_status, complaint.assigned_to))
+            complaint.assigned_to = officer.id
+            if complaint.status == ComplaintStatus.SUBMITTED:
+                complaint.status = ComplaintStatus.UNDER_REVIEW
+
+            audit_entries.append({
+                "complaint_id": complaint.id,
+                "user_id": officer.id,
+                "action_type": "CLAIMED",
+                "previous_state": previous_status,
+                "new_state": complaint.status.value,
+                "details": {"claimed_by": officer.email},
+                "ip_address": ip_address
+            })
+
+        audit_service.create_audit_logs_bulk(db, audit_entries)
+        db.commit()
+        return claimed
+
+
+work_queue_service = WorkQueueService()
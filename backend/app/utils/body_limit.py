@@ -0,0 +1,40 @@
+from typing import Any, Callable, Coroutine, Type
+from fastapi import HTTPException, Request, status
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+# Room for the multipart boundaries and part headers around an uploaded file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class BodySizeLimitRoute(APIRoute):
+    """
+    Route that refuses request bodies over max_body_size by their
+    Content-Length, before anything is read. FastAPI parses (and spools)
+    multipart forms before dependencies or the endpoint run, so a size
+    check there only fires after the whole upload has arrived.
+    """
+
+    max_body_size: int = 0
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        limit = self.max_body_size
+
+        async def limited_handler(request: Request) -> Response:
+            length = request.headers.get("content-length")
+            if length is None:
+                raise HTTPException(status_code=status.HTTP_411_LENGTH_REQUIRED, detail="Content-Length required")
+            if not length.isdigit() or int(length) > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Request body exceeds maximum size of {limit} bytes"
+                )
+            return await handler(request)
+
+        return limited_handler
+
+
+def body_size_limit(max_body_size: int) -> Type[APIRoute]:
+    """Route class for add_api_route(route_class_override=...) with the given body limit"""
+    return type("BodySizeLimitRoute", (BodySizeLimitRoute,), {"max_body_size": max_body_size})
@@ -0,0 +1,181 @@
+import os
+from typing import Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from ..config import get_settings
+
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024  # 64KB
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+# Types a browser may render in place; anything else is offered as a download
+INLINE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "application/pdf"}
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range 'bytes=' header into an inclusive (start, end) pair.
+    Returns None when the header should be ignored (malformed or multi-range),
+    raises 416 when the range cannot be satisfied.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start_str, sep, end_str = ranges.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            suffix_length = int(end_str)
+            start = max(file_size - suffix_length, 0)
+            end = file_size - 1 if suffix_length else -1
+    except ValueError:
+        return None
+
+    if start < 0 or start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+
+    return start, min(end, file_size - 1)
+
+
+class RangeFileResponse(Response):
+    """
+    Streams [start, end] of a file. Uses the ASGI zero-copy send extension
+    (kernel sendfile) when the server offers it, otherwise reads in chunks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None
+    ):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+
+        count = self.end - self.start + 1
+        if scope["method"] == "HEAD" or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": f,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0
+                })
+        if remaining > 0:
+            # File shrank underneath us; close the response cleanly
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_response(
+    request: Request,
+    path: str,
+    relative_path: str,
+    media_type: str,
+    content_hash: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Response:
+    """
+    Build a download response for a file on disk with conditional GET,
+    HTTP Range and long-lived caching for content-addressed files.
+    """
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # Uploaded bytes must never be sniffed into something executable (HTML, SVG)
+    headers = {"Accept-Ranges": "bytes", "X-Content-Type-Options": "nosniff"}
+    if content_hash:
+        # Content-addressed files never change, so the hash is a strong validator
+        etag = f'"{content_hash}"'
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "private, max-age=31536000, immutable"
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+            return Response(status_code=304, headers=headers)
+    else:
+        etag = None
+        headers["Cache-Control"] = "private, no-cache"
+
+    if filename:
+        disposition = "inline" if media_type in INLINE_TYPES else "attachment"
+        headers["Content-Disposition"] = f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+    # Hand the transfer to the reverse proxy (nginx X-Accel-Redirect, X-Sendfile);
+    # it serves the body with sendfile and handles Range itself
+    if settings.SENDFILE_HEADER:
+        headers[settings.SENDFILE_HEADER] = (
+            settings.SENDFILE_PREFIX.rstrip("/") + "/" + relative_path.replace(os.sep, "/")
+        )
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    file_size = os.path.getsize(path)
+    start, end = 0, file_size - 1
+    status_code = 200
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range_header(range_header, file_size)
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    return RangeFileResponse(
+        path,
+        start,
+        end,
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
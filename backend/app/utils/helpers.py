@@ -1,14 +1,15 @@
 import hashlib
 import json
-from datetime import datetime
 import secrets
-import string
+from typing import Iterable, Optional, Union
 
-def generate_complaint_id() -> str:
-    """Generate unique complaint ID in format SGRS-YYYY-MM-XXXXX"""
-    now = datetime.now()
-    random_num = ''.join(secrets.choice(string.digits) for _ in range(5))
-    return f"SGRS-{now.year}-{now.month:02d}-{random_num}"
+def complaint_id_prefix(period: str) -> str:
+    """Complaint ID prefix for a YYYY-MM period"""
+    return f"SGRS-{period}-"
+
+def format_complaint_id(period: str, sequence: int) -> str:
+    """Format complaint ID as SGRS-YYYY-MM-XXXXX (widens past 99999)"""
+    return f"{complaint_id_prefix(period)}{sequence:05d}"
 
 def generate_verification_token() -> str:
     """Generate random verification token"""
@@ -19,6 +20,31 @@ def compute_hash(data: dict, previous_hash: str = "") -> str:
     hash_string = json.dumps(data, sort_keys=True) + previous_hash
     return hashlib.sha256(hash_string.encode()).hexdigest()
 
+HASH_V2_DOMAIN = b"SGRS-AUDIT-V2"
+
+# Built once: json.dumps with non-default options constructs a new encoder per call
+_canonical_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+def canonical_json(value) -> str:
+    """Compact, key-sorted JSON with no NaN/Infinity; one text per value"""
+    return _canonical_encoder.encode(value)
+
+def compute_hash_v2(fields: Iterable[Optional[Union[int, str]]], previous_hash: str = "") -> str:
+    """
+    SHA-256 over length-prefixed fields: each is a type byte (n, i or s),
+    a 4-byte big-endian length and its UTF-8 payload, so no two field
+    sequences encode to the same bytes and no JSON library is involved.
+    """
+    parts = [HASH_V2_DOMAIN]
+    for value in (*fields, previous_hash):
+        if value is None:
+            parts.append(b"n\x00\x00\x00\x00")
+            continue
+        tag = b"i" if isinstance(value, int) else b"s"
+        payload = str(value).encode()
+        parts.append(tag + len(payload).to_bytes(4, "big") + payload)
+    return hashlib.sha256(b"".join(parts)).hexdigest()
+
 def validate_file_type(filename: str, allowed_types: list) -> bool:
     """Validate file extension"""
     return any(filename.lower().endswith(ext) for ext in allowed_types)
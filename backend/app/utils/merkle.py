@@ -0,0 +1,73 @@
+"""
+Merkle trees in the style of RFC 6962 (Certificate Transparency): leaves
+and interior nodes are hashed with distinct prefixes, and a tree of any
+size is built by promoting the last unpaired node to the next level.
+"""
+import hashlib
+from typing import List
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def audit_leaf(log_id: int, log_hash: str) -> bytes:
+    """Leaf hash of an audit log entry; binds the entry's hash to its id"""
+    return leaf_hash(f"{log_id}:{log_hash}".encode())
+
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    paired = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        paired.append(level[-1])
+    return paired
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    level = leaves
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def inclusion_proof(leaves: List[bytes], index: int) -> List[bytes]:
+    """Sibling hashes from leaf `index` up to the root"""
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+        level = _next_level(level)
+    return proof
+
+
+def verify_inclusion(leaf: bytes, index: int, tree_size: int, proof: List[bytes], root: bytes) -> bool:
+    """Check an inclusion proof against a root (RFC 9162, section 2.1.3.2)"""
+    if index >= tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    result = leaf
+    for sibling in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            result = node_hash(sibling, result)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            result = node_hash(result, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and result == root
@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from ..database import engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.value = 0
+
+
+# Threadpool calls run in a copy of the request's context, so they share this counter
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.value += 1
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed on the engine within this block"""
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
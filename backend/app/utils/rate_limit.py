@@ -0,0 +1,39 @@
+from fastapi import Depends, HTTPException, Request, status
+from ..models.user import User
+from ..services.rate_limit_service import rate_limit_service, RateLimitExceeded
+from .security import get_current_active_user
+
+
+def _client_ip(request: Request):
+    return request.client.host if request.client else None
+
+def _too_many_requests(e: RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests, please retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+def check_rate_limit(route: str, request: Request, current_user: User):
+    """Charge an authenticated request to its route's limits; raises 429 when over"""
+    try:
+        rate_limit_service.check(
+            route, _client_ip(request), current_user.role.value, current_user.id
+        )
+    except RateLimitExceeded as e:
+        raise _too_many_requests(e)
+
+def rate_limit(route: str):
+    """Dependency limiting an authenticated route per user (by role) and per client IP"""
+    def dependency(request: Request, current_user: User = Depends(get_current_active_user)):
+        check_rate_limit(route, request, current_user)
+    return dependency
+
+def ip_rate_limit(route: str):
+    """Dependency limiting an unauthenticated route per client IP"""
+    def dependency(request: Request):
+        try:
+            rate_limit_service.check(route, _client_ip(request))
+        except RateLimitExceeded as e:
+            raise _too_many_requests(e)
+    return dependency
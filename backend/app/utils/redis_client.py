@@ -0,0 +1,16 @@
+from functools import lru_cache
+import redis
+from ..config import get_settings
+
+settings = get_settings()
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Shared synchronous Redis client (connections are pooled and thread-safe)"""
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_timeout=2,
+        socket_connect_timeout=2
+    )
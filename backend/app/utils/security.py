@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import uuid
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
@@ -8,6 +9,8 @@ from sqlalchemy.orm import Session
 from ..config import get_settings
 from ..database import get_db
 from ..models.user import User
+from ..services.principal_cache import principal_cache
+from ..services.token_revocation_service import token_revocation_service
 
 settings = get_settings()
 
@@ -23,13 +26,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         print(f"Password verification error: {e}")
         return False
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
     """Hash a password using bcrypt directly"""
     # Truncate password to 72 bytes before hashing
     password_bytes = password.encode('utf-8')[:72]
-    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS))
     return hashed.decode('utf-8')
 
+def password_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12)"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def new_token_id() -> str:
+    return uuid.uuid4().hex
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -37,10 +50,58 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(data: dict) -> str:
+    """Create a single-use JWT refresh token; `data` must carry sub and fam"""
+    to_encode = data.copy()
+    to_encode.update({
+        "exp": datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        "jti": new_token_id(),
+        "type": "refresh"
+    })
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def create_token_pair(email: str, family: Optional[str] = None) -> dict:
+    """Access and refresh token for one login session (token family)"""
+    family = family or new_token_id()
+    return {
+        "access_token": create_access_token(data={"sub": email, "fam": family}),
+        "refresh_token": create_refresh_token(data={"sub": email, "fam": family}),
+        "token_type": "bearer"
+    }
+
+def decode_token(token: str, token_type: str = "access") -> Optional[dict]:
+    """Claims of a valid token of the given type, or None"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    # Tokens issued before token types existed are access tokens
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        return None
+    return payload
+
+def get_user_from_token(token: str, db: Session) -> Optional[User]:
+    """
+    Resolve the user a JWT access token belongs to, or None if the token is
+    invalid or revoked. Users served from the principal cache are detached
+    instances.
+    """
+    payload = decode_token(token)
+    if payload is None or token_revocation_service.is_revoked(payload.get("fam")):
+        return None
+    email: str = payload["sub"]
+    
+    user = principal_cache.get(email)
+    if user is None:
+        user = db.query(User).filter(User.email == email).first()
+        if user:
+            principal_cache.put(user)
+    return user
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
@@ -48,15 +109,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
+    user = get_user_from_token(token, db)
     if user is None:
         raise credentials_exception
     return user
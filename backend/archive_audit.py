@@ -0,0 +1,39 @@
+"""
+Move old audit log entries into compressed archive segments.
+
+    python archive_audit.py
+
+Run periodically (e.g. monthly from cron, after anchor_audit.py). Each
+month that ended more than AUDIT_ARCHIVE_AFTER_DAYS ago becomes one
+segment file in AUDIT_ARCHIVE_DIR; entries that are not anchored yet
+are left for a later run.
+"""
+import sys
+from app.database import SessionLocal
+from app.models import user, complaint
+from app.services.audit_archive import audit_archive, ArchiveCorruptError
+from app.services.audit_archiver import audit_archiver, ArchiveError
+
+
+def main():
+    db = SessionLocal()
+    try:
+        # New chains continue from the archived tips, so the existing segments must be intact
+        for segment in audit_archive.segments(db):
+            audit_archive.verify_segment(segment)
+        segments = audit_archiver.archive_pending(db)
+        for segment in segments:
+            print(f"✅ {segment.period}: entries {segment.first_log_id}-{segment.last_log_id} "
+                  f"({segment.entries}) archived to {segment.path}")
+    except (ArchiveError, ArchiveCorruptError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    if not segments:
+        print("✅ Nothing due for archiving")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Rebuild the complaint analytics rollups from the complaints table.
+
+    python backfill_rollups.py
+
+Run once after creating the complaint_rollups table, and whenever the
+rollups are suspected to have drifted (e.g. after editing complaints by
+hand in SQL). On PostgreSQL complaint writes wait while it runs.
+"""
+import time
+from app.database import SessionLocal
+from app.models import user, complaint
+from app.services.rollup_service import rollup_service
+
+
+def main():
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = rollup_service.backfill(db)
+        print(f"✅ Rebuilt {rows} rollup rows in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
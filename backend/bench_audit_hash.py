@@ -0,0 +1,74 @@
+"""
+Audit hash throughput for each hash version.
+
+Builds an in-memory chain of typical audit entries with each scheme, then
+times appending (hashing new entries) and verifying (recomputing hashes
+from stored rows, as verify_audit.py does). No database is needed.
+
+    python bench_audit_hash.py [ENTRIES]
+"""
+import sys
+import time
+from app.models import user, complaint
+from app.services.audit_service import AuditService, HASH_VERSIONS, verify_chain
+
+ENTRIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+
+def sample_entry(n):
+    return dict(
+        complaint_id=1000 + n % 50,
+        user_id=42,
+        action_type="STATUS_CHANGE",
+        previous_state="in_progress",
+        new_state="resolved",
+        details={
+            "remarks": f"Pipeline repaired and water supply restored, visit {n}",
+            "assigned_to": 17,
+            "department": "Water Supply",
+            "attachments": [f"evidence_{n}_1.jpg", f"evidence_{n}_2.jpg"]
+        },
+        ip_address="10.0.0.1"
+    )
+
+
+def build_chain(version, entries):
+    logs, previous_hash = [], ""
+    for entry in entries:
+        log = AuditService._build_audit_log(previous_hash, hash_version=version, **entry)
+        previous_hash = log.hash
+        logs.append(log)
+    return logs
+
+
+def as_rows(logs):
+    return [
+        (i, log.complaint_id, log.user_id, log.action_type, log.previous_state, log.new_state,
+         log.details, log.hash, log.previous_hash, log.hash_version)
+        for i, log in enumerate(logs, start=1)
+    ]
+
+
+def bench_hash_versions():
+    entries = [sample_entry(n) for n in range(ENTRIES)]
+    rates = {}
+
+    for version in HASH_VERSIONS:
+        start = time.perf_counter()
+        logs = build_chain(version, entries)
+        append_rate = ENTRIES / (time.perf_counter() - start)
+
+        rows = as_rows(logs)
+        start = time.perf_counter()
+        _, broken = verify_chain(rows)
+        verify_rate = ENTRIES / (time.perf_counter() - start)
+
+        assert broken is None, broken
+        rates[version] = verify_rate
+        print(f"✅ v{version}: append {append_rate:,.0f} entries/sec, verify {verify_rate:,.0f} entries/sec")
+
+    print(f"✅ v2 verifies {rates[2] / rates[1]:.1f}x faster than v1")
+
+
+if __name__ == "__main__":
+    bench_hash_versions()
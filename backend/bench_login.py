@@ -0,0 +1,99 @@
+"""
+Login throughput benchmark against a running server.
+
+Registers a pool of officer accounts, then fires concurrent logins while a
+probe thread keeps requesting /health, to show whether the login storm
+starves other endpoints. Start the server with the login and register
+rate limits raised so the benchmark measures hashing, not the limiter:
+
+    RATE_LIMITS='{"auth:login": {"ip": "100000/minute"}, "auth:register": {"ip": "100000/minute"}}' \
+        uvicorn app.main:app --workers 1
+    python bench_login.py [BASE_URL] [LOGINS] [CONCURRENCY]
+"""
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+LOGINS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+CONCURRENCY = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+ACCOUNTS = 50
+PASSWORD = "bench-password-123"
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else float("nan")
+
+
+def ensure_accounts():
+    emails = [f"bench-officer-{i}@bench.sgrs.gov.in" for i in range(ACCOUNTS)]
+
+    def register(email):
+        response = requests.post(f"{BASE_URL}/api/auth/register", json={
+            "email": email,
+            "password": PASSWORD,
+            "full_name": "Bench Officer",
+            "ward": "Ward 1",
+            "role": "officer"
+        })
+        assert response.status_code in (201, 400), response.text
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(register, emails))
+    return emails
+
+
+def probe_health(stop, latencies):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{BASE_URL}/health")
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.02)
+
+
+def test_login_throughput():
+    emails = ensure_accounts()
+    local = threading.local()
+
+    def login(i):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        response = local.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": emails[i % len(emails)],
+            "password": PASSWORD
+        })
+        return response.status_code, time.perf_counter() - start
+
+    stop = threading.Event()
+    health_latencies = []
+    probe = threading.Thread(target=probe_health, args=(stop, health_latencies))
+    probe.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(login, range(LOGINS)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    probe.join()
+
+    ok = [latency for code, latency in results if code == 200]
+    shed = sum(1 for code, _ in results if code == 503)
+    failed = len(results) - len(ok) - shed
+    assert failed == 0, f"{failed} logins failed"
+
+    print(f"✅ {len(ok)} logins in {elapsed:.2f}s ({len(ok) / elapsed:.1f}/sec), {shed} shed with 503")
+    print(f"✅ Login latency p50 {statistics.median(ok) * 1000:.0f}ms, "
+          f"p95 {percentile(ok, 95) * 1000:.0f}ms")
+    print(f"✅ /health during the storm: p50 {statistics.median(health_latencies) * 1000:.1f}ms, "
+          f"p95 {percentile(health_latencies, 95) * 1000:.1f}ms over {len(health_latencies)} probes")
+
+
+if __name__ == "__main__":
+    test_login_throughput()
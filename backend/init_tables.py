@@ -1,7 +1,9 @@
 from app.database import engine, Base
-from app.models.user import User
+from app.models.user import User, RevokedToken
 from app.models.complaint import (
-    Complaint, Attachment, Comment, AuditLog, Feedback, Notification
+    Complaint, Attachment, Comment, AuditLog, Feedback, Notification,
+    ImageHashBand, ComplaintIdSequence, AuditCheckpoint,
+    AuditAnchor, AuditChainHead, AuditArchiveSegment, ComplaintRollup
 )
 
 print("Dropping all tables...")
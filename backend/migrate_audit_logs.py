@@ -0,0 +1,68 @@
+"""
+Bring an existing PostgreSQL audit_logs table up to the current model.
+
+    python migrate_audit_logs.py
+
+create_all only creates missing tables, so databases created before these
+changes need this once. It is safe to re-run: adds hash_version and
+details_text, converts details from a JSON string (Text) to JSONB after
+copying the original text to details_text (JSONB normalises numbers the
+hashes were computed over), and builds the indexes with CREATE INDEX
+CONCURRENTLY so appends are not blocked meanwhile. The type change itself
+rewrites the table under an exclusive lock.
+"""
+import sys
+from sqlalchemy import text
+from app.database import engine
+
+INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_complaint_id_id ON audit_logs (complaint_id, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_timestamp ON audit_logs (timestamp)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_user_id_id ON audit_logs (user_id, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_action_type_id ON audit_logs (action_type, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_details ON audit_logs USING gin (details jsonb_path_ops)",
+]
+
+
+def main():
+    if engine.dialect.name != "postgresql":
+        print("❌ This migration is for PostgreSQL; other databases are built by init_tables.py")
+        sys.exit(1)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        details_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'audit_logs' AND column_name = 'details'"
+        )).scalar()
+        if details_type is None:
+            print("❌ No audit_logs table; run init_tables.py")
+            sys.exit(1)
+
+        conn.execute(text(
+            "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS hash_version INTEGER NOT NULL DEFAULT 1"
+        ))
+        print("✅ hash_version column")
+
+        conn.execute(text("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS details_text TEXT"))
+        print("✅ details_text column")
+
+        if details_type != "jsonb":
+            print("Keeping the hashed text of details...")
+            conn.execute(text(
+                "UPDATE audit_logs SET details_text = details::text "
+                "WHERE details_text IS NULL AND NULLIF(details::text, '') IS NOT NULL"
+            ))
+            print(f"Converting details from {details_type} to jsonb...")
+            conn.execute(text(
+                "ALTER TABLE audit_logs ALTER COLUMN details TYPE JSONB "
+                "USING NULLIF(details::text, '')::jsonb"
+            ))
+        print("✅ details is jsonb")
+
+        for statement in INDEXES:
+            conn.execute(text(statement))
+            print(f"✅ {statement.split(' IF NOT EXISTS ')[1].split(' ON ')[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Bulk-create officer and NGO accounts from a CSV file.
+
+    python provision_users.py officers.csv [default_role]
+
+Columns: email, full_name, password and optionally role, phone, ward,
+department, address. Rows without a role get default_role (officer).
+"""
+import sys
+import time
+from app.database import SessionLocal
+from app.models import user, complaint
+from app.models.user import UserRole
+from app.services.provisioning_service import provisioning_service, ProvisioningError
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    default_role = UserRole(sys.argv[2]) if len(sys.argv) > 2 else UserRole.OFFICER
+    with open(sys.argv[1], "rb") as f:
+        content = f.read()
+
+    try:
+        rows = provisioning_service.parse_csv(content)
+    except ProvisioningError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = provisioning_service.provision(db, rows, default_role)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    for row in result["results"]:
+        if not row["success"]:
+            print(f"❌ Row {row['row']} ({row['email'] or 'no email'}): {row['detail']}")
+
+    print(f"✅ Created {result['created']} users, {result['failed']} failed, in {elapsed:.1f}s")
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
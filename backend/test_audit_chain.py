@@ -0,0 +1,168 @@
+"""
+Concurrency test for audit log appends.
+
+Several processes, each with several threads, append audit entries to a
+small set of shared complaints, mixing single appends and bulk appends
+that span several complaints. Afterwards every chain must verify and
+every chain head must match the last entry of its chain. Half of the
+complaints start with entries written before chain heads existed, so the
+heads are created while appends race on them.
+
+    python test_audit_chain.py                                  # SQLite temp file
+    TEST_DATABASE_URL=postgresql://... python test_audit_chain.py
+"""
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import user, complaint
+from app.models.user import User
+from app.models.complaint import Complaint, ComplaintCategory, AuditLog, AuditChainHead
+from app.services.audit_service import audit_service
+
+PROCESSES = 4
+THREADS = 4
+APPENDS_PER_THREAD = 100
+COMPLAINTS = 8
+BULK_EVERY = 5  # every fifth append is a bulk append over several complaints
+
+
+def make_engine(database_url):
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url)
+
+    # SQLite has no row locks; take the write lock up front the way FOR UPDATE would
+    engine = create_engine(database_url, connect_args={"timeout": 60, "isolation_level": None})
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def entry(complaint_id, user_id, n):
+    return dict(
+        complaint_id=complaint_id,
+        user_id=user_id,
+        action_type="STATUS_CHANGE",
+        previous_state="open",
+        new_state="in_progress",
+        details={"n": n, "pid": os.getpid()},
+        ip_address="127.0.0.1"
+    )
+
+
+def append_in_process(database_url, complaint_ids, user_id):
+    engine = make_engine(database_url)
+    Session = sessionmaker(bind=engine)
+
+    def append(thread):
+        rng = random.Random(f"{os.getpid()}-{thread}")
+        db = Session()
+        appended = 0
+        try:
+            for n in range(APPENDS_PER_THREAD):
+                if n % BULK_EVERY == 0:
+                    targets = rng.sample(complaint_ids, 3)
+                    audit_service.create_audit_logs_bulk(db, [entry(c, user_id, n) for c in targets])
+                    db.commit()
+                    appended += len(targets)
+                else:
+                    audit_service.create_audit_log(db, **entry(rng.choice(complaint_ids), user_id, n))
+                    appended += 1
+        finally:
+            db.close()
+        return appended
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        appended = sum(pool.map(append, range(THREADS)))
+
+    engine.dispose()
+    return appended
+
+
+def _create_chains(database_url):
+    engine = make_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    citizen = User(email=f"chain-{time.time_ns()}@test.sgrs.gov.in", password_hash="-", full_name="Chain Test")
+    db.add(citizen)
+    db.flush()
+    complaints = [
+        Complaint(
+            complaint_id=f"CHAIN-{time.time_ns()}-{i}",
+            citizen_id=citizen.id,
+            title="Chain test",
+            description="Audit chain concurrency test",
+            category=ComplaintCategory.OTHER,
+            ward="Ward 1"
+        )
+        for i in range(COMPLAINTS)
+    ]
+    db.add_all(complaints)
+    db.commit()
+    complaint_ids = [c.id for c in complaints]
+    user_id = citizen.id
+
+    # Entries from before chain heads existed: drop the heads they created
+    legacy = complaint_ids[:COMPLAINTS // 2]
+    audit_service.create_audit_logs_bulk(db, [entry(c, user_id, -1) for c in legacy for _ in range(3)])
+    db.commit()
+    db.query(AuditChainHead).filter(AuditChainHead.complaint_id.in_(legacy)).delete(synchronize_session=False)
+    db.commit()
+
+    db.close()
+    engine.dispose()
+    return complaint_ids, user_id
+
+
+def test_concurrent_appends():
+    database_url = os.getenv("TEST_DATABASE_URL")
+    if not database_url:
+        db_file = os.path.join(tempfile.mkdtemp(), "audit_chain.db")
+        database_url = f"sqlite:///{db_file}"
+
+    complaint_ids, user_id = _create_chains(database_url)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=PROCESSES) as pool:
+        appended = sum(pool.map(
+            append_in_process,
+            [database_url] * PROCESSES,
+            [complaint_ids] * PROCESSES,
+            [user_id] * PROCESSES
+        ))
+    elapsed = time.perf_counter() - start
+
+    engine = make_engine(database_url)
+    db = sessionmaker(bind=engine)()
+    try:
+        total = db.query(func.count(AuditLog.id)).filter(AuditLog.complaint_id.in_(complaint_ids)).scalar()
+        assert total == appended + 3 * (COMPLAINTS // 2), f"expected {appended} new entries, found {total}"
+
+        for complaint_id in complaint_ids:
+            assert audit_service.verify_audit_chain(db, complaint_id), f"chain of complaint {complaint_id} forked"
+
+            last_log = db.query(AuditLog).filter(
+                AuditLog.complaint_id == complaint_id
+            ).order_by(AuditLog.id.desc()).first()
+            length = db.query(func.count(AuditLog.id)).filter(AuditLog.complaint_id == complaint_id).scalar()
+            head = db.get(AuditChainHead, complaint_id)
+            assert head.last_hash == last_log.hash, f"chain head of complaint {complaint_id} is stale"
+            assert head.length == length, f"chain head of complaint {complaint_id} counts {head.length}, not {length}"
+    finally:
+        db.close()
+        engine.dispose()
+
+    print(f"✅ {appended} audit entries on {COMPLAINTS} chains from {PROCESSES} processes x {THREADS} threads "
+          f"in {elapsed:.2f}s ({appended / elapsed:.0f} appends/sec)")
+
+
+if __name__ == "__main__":
+    test_concurrent_appends()
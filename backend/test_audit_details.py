@@ -0,0 +1,105 @@
+"""
+Round-trip test for audit details through a real JSONB column.
+
+PostgreSQL's JSONB stores numbers as numeric and hands them back in its
+own spelling: 1e16 comes back as the int 10000000000000000 and -0.0 as
+0.0. Entries whose details contain such values must still verify after
+being read back, for both hash versions and after archiving. Without a
+PostgreSQL database the same checks run on SQLite, which keeps the JSON
+text as written, so only the PostgreSQL run exercises the JSONB case.
+
+    python test_audit_details.py                                  # SQLite temp file
+    TEST_DATABASE_URL=postgresql://... python test_audit_details.py
+"""
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import user, complaint
+from app.models.user import User
+from app.models.complaint import Complaint, ComplaintCategory, AuditLog
+from app.services.audit_archive import ARCHIVE_COLUMNS, decode_block, encode_block
+from app.services.audit_service import audit_service, archived_chain_row, verify_chain
+
+# Values JSONB does not return the way Python's json module wrote them
+AWKWARD_DETAILS = [
+    {"amount": 1e16},
+    {"delta": -0.0},
+    {"ratio": 1.5e-7, "scale": 2.0, "tiny": 5e-324},
+    {"count": 2 ** 70, "negative": -1e16},
+    {"nested": {"values": [0.1, 1e21, -0.0], "note": "café  "}},
+]
+
+
+def test_details_round_trip():
+    database_url = os.getenv("TEST_DATABASE_URL")
+    if not database_url:
+        db_file = os.path.join(tempfile.mkdtemp(), "audit_details.db")
+        database_url = f"sqlite:///{db_file}"
+
+    engine = create_engine(database_url)
+    jsonb = engine.dialect.name == "postgresql"
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        citizen = User(email=f"details-{time.time_ns()}@test.sgrs.gov.in", password_hash="-", full_name="Details Test")
+        db.add(citizen)
+        db.flush()
+        complaints = {
+            version: Complaint(
+                complaint_id=f"DETAILS-{time.time_ns()}-{version}",
+                citizen_id=citizen.id,
+                title="Details test",
+                description="Audit details JSONB round trip",
+                category=ComplaintCategory.OTHER,
+                ward="Ward 1"
+            )
+            for version in (1, 2)
+        }
+        db.add_all(complaints.values())
+        db.commit()
+
+        for version, complaint_row in complaints.items():
+            audit_service.create_audit_logs_bulk(db, [
+                dict(
+                    complaint_id=complaint_row.id,
+                    user_id=citizen.id,
+                    action_type="UPDATED",
+                    previous_state="submitted",
+                    new_state="in_progress",
+                    details=details,
+                    ip_address="127.0.0.1",
+                    hash_version=version
+                )
+                for details in AWKWARD_DETAILS
+            ])
+        db.commit()
+        db.expire_all()
+
+        for version, complaint_row in complaints.items():
+            rows = db.query(*(getattr(AuditLog, column) for column in ARCHIVE_COLUMNS)).filter(
+                AuditLog.complaint_id == complaint_row.id
+            ).order_by(AuditLog.id).all()
+            entries = [dict(row._mapping) for row in rows]
+            if jsonb:
+                assert isinstance(entries[0]["details"]["amount"], int), "details did not come back from a JSONB column"
+
+            assert audit_service.verify_audit_chain(db, complaint_row.id), f"v{version} chain broke after reading back JSONB"
+
+            for entry in entries:
+                entry["timestamp"] = entry["timestamp"].isoformat() if entry["timestamp"] else None
+            archived = decode_block(encode_block(entries))
+            _, broken = verify_chain([archived_chain_row(entry) for entry in archived])
+            assert broken is None, f"v{version} chain broke after archiving: {broken}"
+    finally:
+        db.close()
+        engine.dispose()
+
+    storage = "a JSONB" if jsonb else f"a {engine.dialect.name}"
+    print(f"✅ {len(AWKWARD_DETAILS)} entries per hash version verify after {storage} round trip and archiving")
+
+
+if __name__ == "__main__":
+    test_details_round_trip()
@@ -0,0 +1,41 @@
+"""
+Verify the audit log hash chains of all complaints.
+
+    python verify_audit.py            # entries added since the last run
+    python verify_audit.py --full     # re-verify everything from the start, archive included
+    python verify_audit.py --workers 8
+
+Exits with status 1 if any chain is broken.
+"""
+import argparse
+import sys
+from app.database import SessionLocal
+from app.models import user, complaint
+from app.services.audit_archive import ArchiveCorruptError
+from app.services.audit_verifier import AuditVerifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify audit log hash chains")
+    parser.add_argument("--full", action="store_true", help="ignore checkpoints and verify every entry")
+    parser.add_argument("--workers", type=int, default=0, help="verification processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    try:
+        report = AuditVerifier(SessionLocal, args.workers).run(full=args.full)
+    except ArchiveCorruptError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for complaint_id, reason in report.broken:
+        print(f"❌ Complaint {complaint_id}: {reason}")
+
+    print(f"✅ Verified {report.entries} entries across {report.complaints} complaints "
+          f"in {report.elapsed:.2f}s ({report.entries_per_second:.0f} entries/sec)")
+    if report.broken:
+        print(f"❌ {len(report.broken)} broken chains")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()